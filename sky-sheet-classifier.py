@@ -1,9 +1,206 @@
 import os
+import sys
+import codecs
 import json
 import re
 import shutil
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
 from pathlib import Path
 
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+try:
+    import numpy as np
+    from numba import njit
+except ImportError:  # Optional accelerator; the regex scanners are used instead
+    njit = None
+
+# Precompiled detection patterns (compiled once, reused for every file).
+# All patterns are ASCII and run directly on the raw bytes of each file.
+_HTML_RE = re.compile(rb'<html>|<div|<body>|DOCTYPE', re.IGNORECASE)
+_SKY_SCRIPT_RE = re.compile(rb'\b[ljkhgfdsa]{2,}\b', re.IGNORECASE)
+_ABC_RE = re.compile(rb'[ABC][1-5]', re.IGNORECASE)
+_JIANPU_RE = re.compile(rb'\b[1-7]\b')
+_ENGLISH_RE = re.compile(rb'\b[CDEFGAB][#b]?[0-9]?\b')
+_JIANPU_MARKER_RE = re.compile(rb'1=|bpm|4/4|3/4|2/4', re.IGNORECASE)
+# Zero-width lookahead counts every note start, matching per-note substring counts
+_DOREMI_RE = re.compile(rb'(?=do|re|mi|fa|sol|la|ti|si)', re.IGNORECASE)
+_JSON_MARKER_RE = re.compile(rb'"(songNotes|columns|instruments|isComposed|appName|bpm)"')
+_SKY_MUSIC_JSON_KEYS = frozenset({b'columns', b'instruments', b'isComposed', b'appName'})
+
+# str twins of the text-format patterns for heads with non-ASCII bytes: on bytes, \b and \w
+# treat every UTF-8 multibyte sequence as a separator (CJK lyrics would count as Jianpu)
+_STR_PATTERNS = {
+    pattern: re.compile(pattern.pattern.decode('ascii'), pattern.flags & re.IGNORECASE)
+    for pattern in (_HTML_RE, _SKY_SCRIPT_RE, _ABC_RE, _JIANPU_RE, _ENGLISH_RE,
+                    _JIANPU_MARKER_RE, _DOREMI_RE)
+}
+
+FICLONE = 0x40049409  # Linux ioctl: share data extents between files (btrfs/xfs)
+
+REPORT_SAMPLE_SIZE = 10  # File names kept per category for the report
+LOG_FLUSH_EVERY = 1000  # Per-file log lines buffered between stdout writes
+
+CACHE_FILENAME = '.classify_cache.json'
+CACHE_MAX_ENTRIES = 50000
+CACHE_VERSION = 5  # Bump whenever detection rules change to invalidate old results
+
+if njit is not None:
+    # Byte classes for the fused scanner
+    _WORD, _ABC_LETTER, _DIGIT_1_5, _DIGIT_1_7, _NOTE_LETTER, _DIGIT, _FLAT = 1, 2, 4, 8, 16, 32, 64
+    
+    def _build_scan_tables():
+        """Build the byte-class, ASCII lower-case and Doremi pair lookup tables."""
+        byte_class = np.zeros(256, dtype=np.uint8)
+        for b in range(256):
+            c = chr(b)
+            if b < 128 and (c.isalnum() or c == '_'):
+                byte_class[b] |= _WORD
+        for bits, chars in ((_ABC_LETTER, 'abcABC'), (_DIGIT_1_5, '12345'),
+                            (_DIGIT_1_7, '1234567'), (_NOTE_LETTER, 'CDEFGAB'),
+                            (_DIGIT, '0123456789'), (_FLAT, 'b')):
+            for c in chars:
+                byte_class[ord(c)] |= bits
+        lower = np.array([b + 32 if 65 <= b <= 90 else b for b in range(256)], dtype=np.uint8)
+        doremi_pairs = np.zeros((256, 256), dtype=np.bool_)
+        for note in ('do', 're', 'mi', 'fa', 'la', 'ti', 'si'):
+            doremi_pairs[ord(note[0]), ord(note[1])] = True
+        return byte_class, lower, doremi_pairs
+    
+    _BYTE_CLASS, _LOWER, _DOREMI_PAIRS = _build_scan_tables()
+    
+    @njit(cache=True)
+    def _scan_bytes(buf, byte_class, lower, doremi_pairs):
+        """Count ABC, Jianpu, Doremi and English hits in one pass over buf.
+        
+        Mirrors _ABC_RE, _JIANPU_RE, _DOREMI_RE and _ENGLISH_RE on bytes:
+        Jianpu and English notes are whole ASCII words, ABC pairs and
+        Doremi syllables may appear anywhere.
+        """
+        abc = jianpu = doremi = english = 0
+        prev_cls = 0
+        prev_lo = 0
+        prev2_lo = 0
+        word_len = 0
+        first_cls = 0
+        note_state = 0  # 1: note letter, 2: +flat, 3: +octave digit, 0: not a note
+        n = buf.shape[0]
+        for i in range(n + 1):
+            b = buf[i] if i < n else 32  # Trailing separator closes the last word
+            cls = byte_class[b]
+            lo = lower[b]
+            
+            if cls & _DIGIT_1_5 and prev_cls & _ABC_LETTER:
+                abc += 1
+            if doremi_pairs[prev_lo, lo] or (prev2_lo == 115 and prev_lo == 111 and lo == 108):  # 'sol'
+                doremi += 1
+            
+            if cls & _WORD:
+                if word_len == 0:
+                    first_cls = cls
+                    note_state = 1 if cls & _NOTE_LETTER else 0
+                elif note_state == 1:
+                    note_state = 2 if cls & _FLAT else (3 if cls & _DIGIT else 0)
+                elif note_state == 2:
+                    note_state = 3 if cls & _DIGIT else 0
+                else:
+                    note_state = 0
+                word_len += 1
+            elif word_len:
+                if word_len == 1 and first_cls & _DIGIT_1_7:
+                    jianpu += 1
+                if note_state:
+                    english += 1
+                word_len = 0
+            
+            prev_cls = cls
+            prev2_lo = prev_lo
+            prev_lo = lo
+        return abc, jianpu, doremi, english
+else:
+    _scan_bytes = None
+
+def _count_upto(pattern, content, limit):
+    """Count matches of pattern in content, stopping once limit is reached."""
+    return sum(1 for _ in islice(pattern.finditer(content), limit))
+
+def _pattern_for(pattern, content):
+    """Return pattern for bytes content, or its str twin for decoded content."""
+    return _STR_PATTERNS[pattern] if isinstance(content, str) else pattern
+
+def _scan_counts(content):
+    """Collect the counted text-format signals for content in one place.
+
+    Uses the Numba-compiled single-pass scanner on ASCII bytes when available;
+    otherwise each counter is gathered with a single precompiled regex scan,
+    capped just past its threshold. The per-format thresholds are applied by
+    the caller.
+    """
+    if _scan_bytes is not None and isinstance(content, bytes):
+        abc, jianpu, doremi, english = _scan_bytes(
+            np.frombuffer(content, dtype=np.uint8), _BYTE_CLASS, _LOWER, _DOREMI_PAIRS)
+    else:
+        # Only "more than N" matters to the caller, so stop each scan as soon
+        # as its threshold is crossed instead of collecting every match
+        abc = _count_upto(_pattern_for(_ABC_RE, content), content, 4)
+        jianpu = _count_upto(_pattern_for(_JIANPU_RE, content), content, 6)
+        doremi = _count_upto(_pattern_for(_DOREMI_RE, content), content, 4)
+        english = _count_upto(_pattern_for(_ENGLISH_RE, content), content, 6)
+    return {
+        'abc_hits': abc,
+        'jianpu_hits': jianpu,
+        'jianpu_marker_seen': _pattern_for(_JIANPU_MARKER_RE, content).search(content) is not None,
+        'doremi_hits': doremi,
+        'english_hits': english,
+    }
+
+def _fast_copy(src, dst, link=False):
+    """Copy src to dst, preferring a hardlink (opt-in) or reflink over copying bytes."""
+    if link:
+        try:
+            os.link(src, dst)
+            return
+        except OSError:
+            pass  # Cross-device or unsupported; fall back to a real copy
+    
+    if fcntl is not None and sys.platform.startswith('linux'):
+        try:
+            with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+                fcntl.ioctl(fdst.fileno(), FICLONE, fsrc.fileno())
+        except OSError:
+            pass  # Filesystem without reflink support
+        else:
+            _copy_times(src, dst)
+            return
+    
+    shutil.copyfile(src, dst)  # Uses os.sendfile where the platform supports it
+    _copy_times(src, dst)
+
+def _name_key(name):
+    """Collision key for file names on a case-insensitive filesystem."""
+    return os.path.normcase(name).casefold()
+
+def _is_case_insensitive(directory):
+    """Whether directory lives on a case-insensitive filesystem (e.g. default macOS/Windows)."""
+    directory = Path(directory)
+    swapped_name = directory.name.swapcase()
+    if swapped_name == directory.name:
+        return False  # No cased letters to probe with
+    try:
+        return os.path.samefile(directory, directory.with_name(swapped_name))
+    except OSError:
+        return False
+
+def _copy_times(src, dst):
+    """Carry over access/modification times, the only metadata sorted copies keep."""
+    st = os.stat(src)
+    os.utime(dst, ns=(st.st_atime_ns, st.st_mtime_ns))
+
 class SkyMusicSheetClassifier:
     """
     Classifies Sky music sheets into different format categories based on content analysis.
@@ -33,117 +230,165 @@ class SkyMusicSheetClassifier:
             'html_sheets': 'HTML_Visual_Sheets',
             'unknown_format': 'Unknown_Format'
         }
+        self.cache_path = self.output_base_dir / CACHE_FILENAME
+        self._cache = self.load_cache()
+        self._existing_names = {}  # target dir -> (names already present there, name key)
+        self._log_buf = []
+        self.verbose = True
         
-    def read_file_content(self, file_path, max_chars=2048):
-        """Safely read file content with encoding fallback."""
-        encodings = ['utf-8', 'utf-8-sig', 'latin-1', 'cp1252']
+    def load_cache(self):
+        """Load cached classifications keyed by absolute path."""
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                cache = json.load(f)
+            if isinstance(cache, dict) and cache.get('version') == CACHE_VERSION:
+                return cache['entries']
+        except (OSError, ValueError):
+            pass
+        return {}
+    
+    def save_cache(self):
+        """Persist cached classifications, dropping the least recently used entries."""
+        while len(self._cache) > CACHE_MAX_ENTRIES:
+            del self._cache[next(iter(self._cache))]
+        try:
+            self.output_base_dir.mkdir(parents=True, exist_ok=True)
+            with open(self.cache_path, 'w', encoding='utf-8') as f:
+                json.dump({'version': CACHE_VERSION, 'entries': self._cache}, f)
+        except OSError as e:
+            print(f"Warning: could not save classification cache: {e}")
         
-        for encoding in encodings:
+    def read_file_content(self, file_path, max_bytes=2048):
+        """Read the head of a file as raw bytes with a single unbuffered read."""
+        try:
+            fd = os.open(file_path, os.O_RDONLY | getattr(os, 'O_BINARY', 0))
             try:
-                with open(file_path, 'r', encoding=encoding, errors='ignore') as f:
-                    return f.read(max_chars).strip()
-            except:
-                continue
-        return ""
+                raw = os.read(fd, max_bytes + len(codecs.BOM_UTF8))
+            finally:
+                os.close(fd)
+        except OSError:
+            return b""
+        
+        # Text sheets never contain NUL bytes; treat binary files as unreadable
+        if b'\x00' in raw:
+            return b""
+        if raw.startswith(codecs.BOM_UTF8):
+            raw = raw[len(codecs.BOM_UTF8):]
+        return raw[:max_bytes].strip()
     
     def detect_json_type(self, content, file_path):
-        """Detect specific JSON format type."""
-        try:
-            # Try to parse as JSON
-            if content.startswith('['):
-                data = json.loads(content[:1000] + ']' if len(content) > 1000 else content)
-                if isinstance(data, list) and len(data) > 0:
-                    first_item = data[0]
-                    if isinstance(first_item, dict):
-                        # Sky Studio JSON format markers
-                        if 'songNotes' in first_item and 'time' in str(first_item):
-                            return 'sky_studio_json'
-            else:
-                data = json.loads(content[:1000] + '}' if len(content) > 1000 else content)
-                if isinstance(data, dict):
-                    # Sky Music JSON format markers
-                    if any(key in data for key in ['columns', 'instruments', 'isComposed', 'appName']):
-                        return 'sky_music_json'
-                    # Sky Studio single song format
-                    elif 'songNotes' in data and 'bpm' in data:
-                        return 'sky_studio_json'
-                        
-        except json.JSONDecodeError:
-            pass
+        """Detect specific JSON format type from its top-level key markers."""
+        first = content[:1]
+        if first not in (b'[', b'{'):
+            return None
+        
+        if first == b'[':
+            # Sky Studio JSON format markers (list of songs); one key needs no regex
+            if b'"songNotes"' in content:
+                return 'sky_studio_json'
+        else:
+            markers = set(_JSON_MARKER_RE.findall(content))
+            # Sky Music JSON format markers
+            if markers & _SKY_MUSIC_JSON_KEYS:
+                return 'sky_music_json'
+            # Sky Studio single song format
+            elif b'songNotes' in markers and b'bpm' in markers:
+                return 'sky_studio_json'
             
         return None
     
-    def detect_text_format(self, content):
-        """Detect text-based music notation format."""
-        content_lower = content.lower()
-        lines = content.split('\n')[:20]  # Check first 20 lines
+    def detect_text_format(self, content, check_html=True):
+        """Detect text-based music notation format.
+        
+        check_html=False skips the HTML check for callers that already ran it.
+        """
+        # Pure-ASCII heads are matched as bytes; anything else is decoded first
+        # so word boundaries fall between characters, not inside them
+        if not content.isascii():
+            content = content.decode('utf-8', errors='ignore')
         
+        # Boolean signals short-circuit before any counting scan runs
         # HTML format detection
-        if any(tag in content_lower for tag in ['<html>', '<div', '<body>', 'DOCTYPE']):
+        if check_html and _pattern_for(_HTML_RE, content).search(content):
             return 'html_sheets'
             
         # Sky Script format detection (key pattern: letters like l, j, k, h, g, f, d, s, a)
-        sky_script_pattern = r'[ljkhgfdsa\s\d]+'
-        if re.search(r'\b[ljkhgfdsa]{2,}\b', content_lower):
+        if _pattern_for(_SKY_SCRIPT_RE, content).search(content):
             return 'sky_script_text'
         
+        counts = _scan_counts(content)
+        
         # ABC1-5 format detection (A1, B2, C3, etc.)
-        abc_pattern = r'[ABC][1-5]'
-        if re.search(abc_pattern, content, re.IGNORECASE):
-            abc_matches = len(re.findall(abc_pattern, content, re.IGNORECASE))
-            if abc_matches > 3:  # Multiple ABC1-5 notes found
-                return 'abc15_text'
+        if counts['abc_hits'] > 3:  # Multiple ABC1-5 notes found
+            return 'abc15_text'
         
         # Jianpu format detection (numbered notation 1-7)
-        jianpu_pattern = r'\b[1-7]\b'
-        if re.search(jianpu_pattern, content):
-            # Check for typical Jianpu markers
-            jianpu_markers = ['1=', 'bpm', '4/4', '3/4', '2/4']
-            if any(marker in content_lower for marker in jianpu_markers):
-                return 'jianpu_text'
-            # Count standalone numbers 1-7
-            jianpu_matches = len(re.findall(jianpu_pattern, content))
-            if jianpu_matches > 5:
+        if counts['jianpu_hits']:
+            # Typical Jianpu markers, or enough standalone numbers 1-7
+            if counts['jianpu_marker_seen'] or counts['jianpu_hits'] > 5:
                 return 'jianpu_text'
         
         # Doremi format detection
-        doremi_notes = ['do', 're', 'mi', 'fa', 'sol', 'la', 'ti', 'si']
-        doremi_count = sum(content_lower.count(note) for note in doremi_notes)
-        if doremi_count > 3:
+        if counts['doremi_hits'] > 3:
             return 'doremi_text'
         
         # English notation detection (C, D, E, F, G, A, B)
-        english_pattern = r'\b[CDEFGAB][#b]?[0-9]?\b'
-        english_matches = len(re.findall(english_pattern, content))
-        if english_matches > 5:
+        if counts['english_hits'] > 5:
             return 'english_text'
         
         return None
     
     def classify_file(self, file_path):
         """Classify a single file and return its format."""
-        file_path = Path(file_path)
+        file_path = os.fspath(file_path)
         
         # Skip hidden files and directories
-        if file_path.name.startswith('.'):
+        if os.path.basename(file_path).startswith('.'):
             return None
-            
+        
+        # Reuse the previous result when the file is unchanged since last run
+        try:
+            st = os.stat(file_path)
+        except OSError:
+            return None
+        cache_key = os.path.abspath(file_path)
+        stamp = f"{st.st_size}:{st.st_mtime_ns}"
+        cached = self._cache.pop(cache_key, None)
+        if cached is not None and cached[0] == stamp:
+            self._cache[cache_key] = cached  # Mark as most recently used
+            return cached[1]
+        
+        format_type = self._classify_content(file_path)
+        self._cache[cache_key] = [stamp, format_type]
+        return format_type
+    
+    def _classify_content(self, file_path):
+        """Classify a file from its content, falling back to its extension."""
         content = self.read_file_content(file_path)
         if not content:
             return None
         
-        # JSON format detection (works for both .json and .txt files containing JSON)
-        json_type = self.detect_json_type(content, file_path)
-        if json_type:
-            return json_type
+        # Dispatch on the cheapest discriminators first: leading character and extension
+        ext = os.path.splitext(file_path)[1].lower()
+        first = content[:1]
+        check_html = True
+        if first in (b'[', b'{'):
+            # JSON format detection (works for both .json and .txt files containing JSON)
+            json_type = self.detect_json_type(content, file_path)
+            if json_type:
+                return json_type
+        elif first == b'<' or ext == '.html':
+            # Markup is almost always an HTML sheet; confirm before the note-notation scans
+            if _HTML_RE.search(content):
+                return 'html_sheets'
+            check_html = False  # Already ruled out, so detect_text_format need not repeat it
         
         # Text format detection
-        text_type = self.detect_text_format(content)
+        text_type = self.detect_text_format(content, check_html)
         if text_type:
             return text_type
             
         # Fallback based on file extension
-        ext = file_path.suffix.lower()
         if ext == '.html':
             return 'html_sheets'
         elif ext in ['.json', '.txt']:
@@ -151,66 +396,149 @@ class SkyMusicSheetClassifier:
         
         return None
     
+    def _iter_files(self, root):
+        """Recursively yield DirEntry objects for regular files under root."""
+        with os.scandir(root) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    yield from self._iter_files(entry.path)
+                elif entry.is_file(follow_symlinks=False):
+                    yield entry
+    
+    def _classify_entry(self, entry):
+        """Classify a DirEntry, returning it alongside its format (worker-thread safe)."""
+        # Hidden files are skipped before any file I/O
+        if entry.name.startswith('.'):
+            return entry, None
+        return entry, self.classify_file(entry.path)
+    
     def create_output_directories(self):
         """Create output directories for each format."""
         for format_dir in self.formats.values():
             Path(self.output_base_dir / format_dir).mkdir(parents=True, exist_ok=True)
     
-    def sort_files(self, copy_files=True):
-        """Sort all files in input directory by format."""
-        self.create_output_directories()
-        
-        results = {format_name: [] for format_name in self.formats.values()}
-        results['skipped'] = []
-        
-        for file_path in self.input_dir.rglob('*'):
-            if file_path.is_file():
-                format_type = self.classify_file(file_path)
-                
-                if format_type and format_type in self.formats:
-                    target_dir = self.output_base_dir / self.formats[format_type]
-                    target_path = target_dir / file_path.name
-                    
-                    # Handle duplicate filenames
-                    counter = 1
-                    while target_path.exists():
-                        stem = file_path.stem
-                        suffix = file_path.suffix
-                        target_path = target_dir / f"{stem}_{counter}{suffix}"
-                        counter += 1
-                    
-                    if copy_files:
-                        shutil.copy2(file_path, target_path)
-                        print(f"Copied: {file_path.name} -> {self.formats[format_type]}/")
-                    else:
-                        shutil.move(str(file_path), str(target_path))
-                        print(f"Moved: {file_path.name} -> {self.formats[format_type]}/")
-                    
-                    results[self.formats[format_type]].append(file_path.name)
-                else:
-                    results['skipped'].append(file_path.name)
-                    print(f"Skipped: {file_path.name} (unknown format)")
+    def sort_files(self, copy_files=True, max_workers=None, link_files=False, verbose=True):
+        """Sort all files in input directory by format.
+        
+        Files are classified concurrently on a thread pool; copying/moving
+        stays on the calling thread so duplicate-name handling needs no locks.
+        With link_files=True copies are hardlinked, which is only safe when
+        the sorted tree is treated as read-only. Per-file lines are written
+        in batches; verbose=False silences them for bulk runs.
+        """
+        if max_workers is None:
+            max_workers = min(32, (os.cpu_count() or 1) * 4)
+        self.verbose = verbose
+        # Format directories are created on first use (see _unique_name),
+        # so only the categories actually present end up on disk
         
+        # Live per-category Counter plus a bounded sample of names, so memory stays
+        # O(categories) no matter how many files are sorted
+        samples = {format_name: [] for format_name in self.formats.values()}
+        samples['skipped'] = []
+        results = {'counts': Counter(), 'samples': samples}
+        
+        try:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                # Keep a bounded window of pending work (in walk order) instead of
+                # queueing the whole directory tree up front
+                pending = deque()
+                for entry in self._iter_files(self.input_dir):
+                    pending.append(executor.submit(self._classify_entry, entry))
+                    if len(pending) >= max_workers * 4:
+                        self._place_file(*pending.popleft().result(), copy_files, link_files, results)
+                while pending:
+                    self._place_file(*pending.popleft().result(), copy_files, link_files, results)
+        finally:
+            self._flush_log()  # Don't lose buffered lines if a copy fails midway
+        
+        self.save_cache()
         return results
     
+    def _unique_name(self, target_dir, name):
+        """Pick a non-colliding file name in target_dir, creating the directory on first use."""
+        known = self._existing_names.get(target_dir)
+        if known is None:
+            # First file for this directory: create it, then list it once
+            target_dir.mkdir(parents=True, exist_ok=True)
+            key = _name_key if _is_case_insensitive(target_dir) else str
+            with os.scandir(target_dir) as entries:
+                names = {key(existing.name) for existing in entries}
+            self._existing_names[target_dir] = known = (names, key)
+        names, key = known
+        
+        # Handle duplicate filenames
+        candidate = name
+        if key(candidate) in names:
+            stem, suffix = os.path.splitext(name)
+            counter = 1
+            while key(candidate) in names:
+                candidate = f"{stem}_{counter}{suffix}"
+                counter += 1
+        names.add(key(candidate))
+        return candidate
+    
+    def _place_file(self, entry, format_type, copy_files, link_files, results):
+        """Copy or move a classified file into its format directory."""
+        if format_type and format_type in self.formats:
+            target_dir = self.output_base_dir / self.formats[format_type]
+            target_path = target_dir / self._unique_name(target_dir, entry.name)
+            
+            if copy_files:
+                _fast_copy(entry.path, target_path, link=link_files)
+                self._log(f"Copied: {entry.name} -> {self.formats[format_type]}/")
+            else:
+                shutil.move(entry.path, str(target_path))
+                self._log(f"Moved: {entry.name} -> {self.formats[format_type]}/")
+            
+            self._record(results, self.formats[format_type], entry.name)
+        else:
+            self._record(results, 'skipped', entry.name)
+            self._log(f"Skipped: {entry.name} (unknown format)")
+    
+    def _log(self, line):
+        """Buffer a per-file log line, writing to stdout once per LOG_FLUSH_EVERY lines."""
+        if not self.verbose:
+            return
+        self._log_buf.append(line)
+        if len(self._log_buf) >= LOG_FLUSH_EVERY:
+            self._flush_log()
+    
+    def _flush_log(self):
+        """Write any buffered log lines to stdout in a single call."""
+        if self._log_buf:
+            sys.stdout.write("\n".join(self._log_buf) + "\n")
+            sys.stdout.flush()
+            self._log_buf.clear()
+    
+    @staticmethod
+    def _record(results, category, name):
+        """Count a file under category, keeping only the first few names."""
+        results['counts'][category] += 1
+        sample = results['samples'][category]
+        if len(sample) < REPORT_SAMPLE_SIZE:
+            sample.append(name)
+    
     def generate_report(self, results):
         """Generate a classification report."""
         print("\n" + "="*60)
         print("SKY MUSIC SHEET CLASSIFICATION REPORT")
         print("="*60)
         
-        total_files = sum(len(files) for files in results.values())
+        counts = results['counts']
+        total_files = sum(counts.values())
         
-        for format_name, files in results.items():
-            if files:
-                print(f"\n{format_name}: {len(files)} files")
-                if len(files) <= 10:
+        for format_name, files in results['samples'].items():
+            count = counts[format_name]
+            if count:
+                print(f"\n{format_name}: {count} files")
+                if count <= 10:
                     for file in files[:10]:
                         print(f"  - {file}")
                 else:
                     for file in files[:5]:
                         print(f"  - {file}")
-                    print(f"  ... and {len(files)-5} more files")
+                    print(f"  ... and {count-5} more files")
         
         print(f"\nTOTAL FILES PROCESSED: {total_files}")
         print("="*60)
@@ -224,8 +552,9 @@ def main():
     # Create classifier instance
     classifier = SkyMusicSheetClassifier(input_directory, output_directory)
     
-    # Sort files (copy_files=True to copy files, False to move them)
-    results = classifier.sort_files(copy_files=True)
+    # Sort files (copy_files=True to copy files, False to move them;
+    # link_files=True hardlinks copies for read-only ingestion)
+    results = classifier.sort_files(copy_files=True, link_files=False)
     
     # Generate classification report
     classifier.generate_report(results)
@@ -2,7 +2,7 @@
 """
 Sky Music Converter - Complete All-In-One Script
 
-- Auto-installs FFmpeg on Windows (with explicit pydub config)
+- Auto-installs FFmpeg on Windows (with explicit ffmpeg path config)
 - Auto-installs Python dependencies if missing
 - Converts YouTube videos or audio files to Sky: Children of the Light music sheets
 - Real-time progress tracking via web UI
@@ -14,14 +14,21 @@ import sys
 import json
 import logging
 import subprocess
+import shutil
+import threading
 from pathlib import Path
 import tempfile
 import time
 import uuid
 import platform
 import zipfile
+import re
+import hashlib
+import importlib.util
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import Manager
 import requests
-from flask import Flask, request, jsonify, render_template_string, send_file
+from flask import Flask, request, render_template_string, send_file
 from flask_cors import CORS
 
 # Config logging
@@ -32,28 +39,41 @@ logger = logging.getLogger(__name__)
 # FFmpeg Setup
 # ===========
 
-from pydub import AudioSegment
-
 FFMPEG_BIN_PATH = r"C:\ffmpeg\bin\ffmpeg.exe"
 FFPROBE_BIN_PATH = r"C:\ffmpeg\bin\ffprobe.exe"
 os.environ["FFMPEG_BINARY"] = FFMPEG_BIN_PATH
 os.environ["FFPROBE_BINARY"] = FFPROBE_BIN_PATH
-AudioSegment.converter = FFMPEG_BIN_PATH
-AudioSegment.ffprobe = FFPROBE_BIN_PATH
+# Direct ffmpeg calls use the pinned Windows build when present, else whatever is on PATH
+FFMPEG_CMD = FFMPEG_BIN_PATH if os.path.exists(FFMPEG_BIN_PATH) else "ffmpeg"
+
+# Pitch analysis config: Sky notes top out at C7 (~2.1 kHz), well under Nyquist at 11025 Hz
+ANALYSIS_SR = 11025
+FAST_PITCH_TRACKING = False  # True: plain YIN (no pYIN Viterbi decoding), faster but noisier
+PITCH_CACHE_VERSION = 1  # Bump whenever the analysis settings above or in analyze_samples change
+PITCH_CACHE_MAX_ENTRIES = 64  # Least recently used analyses beyond this are evicted
 
 def download_file(url: str, destination: Path, progress_callback=None):
     response = requests.get(url, stream=True)
     response.raise_for_status()
     total_size = int(response.headers.get('content-length', 0))
-    downloaded = 0
+    response.raw.decode_content = True
     with open(destination, 'wb') as f:
-        for chunk in response.iter_content(chunk_size=8192):
-            if chunk:
-                f.write(chunk)
-                downloaded += len(chunk)
-                if progress_callback and total_size > 0:
-                    progress = (downloaded / total_size) * 100
-                    progress_callback(progress)
+        if not (progress_callback and total_size > 0):
+            shutil.copyfileobj(response.raw, f, length=1 << 20)
+            return
+        # Copy in 1 MiB blocks; progress is sampled from the file position 4x a second, not per block
+        done = threading.Event()
+        def report():
+            while not done.wait(0.25):
+                progress_callback(f.tell() / total_size * 100)
+        reporter = threading.Thread(target=report, daemon=True)
+        reporter.start()
+        try:
+            shutil.copyfileobj(response.raw, f, length=1 << 20)
+        finally:
+            done.set()
+            reporter.join()
+        progress_callback(100.0)
 
 def add_to_path_windows(directory: str):
     import winreg
@@ -106,8 +126,12 @@ def install_ffmpeg_windows():
         temp_dir = Path(tempfile.gettempdir()) / "ffmpeg_install"
         temp_dir.mkdir(exist_ok=True)
         zip_path = temp_dir / "ffmpeg.zip"
+        last_reported = [-1.0]
         def progress_callback(progress):
-            print(f"📥 Download progress: {progress:.1f}%")
+            # Only print when progress moved by at least 1%, so slow consoles don't stall the download
+            if progress - last_reported[0] >= 1.0 or (progress >= 100.0 and last_reported[0] < 100.0):
+                last_reported[0] = progress
+                print(f"📥 Download progress: {progress:.1f}%")
         download_file(download_url, zip_path, progress_callback)
         print("✅ Download completed!")
         print("📂 Extracting FFmpeg...")
@@ -116,7 +140,7 @@ def install_ffmpeg_windows():
             zip_ref.extractall(temp_dir)
         extracted_path = temp_dir / main_folder
         if ffmpeg_dir.exists():
-            import shutil; shutil.rmtree(ffmpeg_dir)
+            shutil.rmtree(ffmpeg_dir)
         shutil.move(str(extracted_path), str(ffmpeg_dir))
         print("✅ FFmpeg extracted to C:/ffmpeg")
         if add_to_path_windows(str(ffmpeg_bin)):
@@ -160,7 +184,8 @@ def check_and_install_dependencies():
         'flask-cors': '>=4.0.0',
         'requests': '>=2.31.0',
         'soundfile': '>=0.12.1',
-        'pydub': '>=0.25.1',
+        'waitress': '>=3.0.0',
+        'orjson': '>=3.9.0',
     }
     print("🔍 Checking Python dependencies...")
     missing = []
@@ -169,7 +194,6 @@ def check_and_install_dependencies():
             if p == 'yt-dlp': import yt_dlp
             elif p == 'flask-cors': from flask_cors import CORS
             elif p == 'soundfile': import soundfile
-            elif p == 'pydub': from pydub import AudioSegment
             else: __import__(p)
             print(f"✅ {p} is available")
         except ImportError:
@@ -177,21 +201,102 @@ def check_and_install_dependencies():
             print(f"❌ {p} not found")
     if missing:
         print(f"📦 Installing missing: {', '.join(missing)}")
-        for pkg in missing:
-            subprocess.check_call([sys.executable, '-m', 'pip', 'install', f'{pkg}{deps[pkg]}'])
-            print(f"✅ Installed {pkg}")
+        # One pip run resolves everything together instead of re-running the resolver per package
+        specs = [f'{pkg}{deps[pkg]}' for pkg in missing]
+        subprocess.check_call([sys.executable, '-m', 'pip', 'install', '--disable-pip-version-check',
+                               '--no-input', '--prefer-binary', *specs])
+        print(f"✅ Installed {', '.join(missing)}")
+    # Optional: FFTW-backed FFTs speed up analysis but are not required; only installed on request
+    if importlib.util.find_spec('pyfftw') is not None:
+        print("✅ pyfftw is available")
+    elif os.environ.get('SKY_AUTO_INSTALL'):
+        try:
+            subprocess.check_call([sys.executable, '-m', 'pip', 'install', 'pyfftw>=0.13.1'])
+            print("✅ Installed pyfftw")
+        except subprocess.CalledProcessError:
+            print("⚠️ pyfftw unavailable, using the default FFT backend")
+    else:
+        print("ℹ️ pyfftw not installed, using the default FFT backend (set SKY_AUTO_INSTALL=1 to install it)")
     print("✅ All Python dependencies satisfied")
 
 # After checking/installing deps, import necessary libs
 import numpy as np
 import librosa
 import yt_dlp
-from flask import Flask, request, jsonify, render_template_string, send_file
+from flask import Flask, request, render_template_string, send_file
 from flask_cors import CORS
 import soundfile as sf
 
-# Global for progress tracking
+# Route librosa/scipy FFTs through FFTW (SIMD kernels + plan cache) when pyFFTW is installed
+try:
+    import pyfftw
+    import scipy.fft
+    pyfftw.interfaces.cache.enable()
+    pyfftw.interfaces.cache.set_keepalive_time(30)
+    scipy.fft.set_global_backend(pyfftw.interfaces.scipy_fft)
+    librosa.set_fftlib(pyfftw.interfaces.numpy_fft)
+except ImportError:
+    pyfftw = None
+
+# orjson serializes sheets and API responses several times faster; stdlib json is the fallback
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Numba ships with librosa; the NumPy path in convert_to_sky_sheet covers its absence
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+if njit is not None:
+    @njit(cache=True)
+    def _classify_and_group(log_pitches, times, log_freqs, threshold, window):
+        """Map log2 pitches to note indices and group them into chords in one native pass.
+
+        Returns (group_times, chord_masks): bit q of chord_masks[g] is set when
+        note index q sounds in group g.
+        """
+        n, k = len(log_pitches), len(log_freqs)
+        note_idx = np.empty(n, np.int64)
+        note_times = np.empty(n, np.float64)
+        m = 0
+        for i in range(n):
+            lp = log_pitches[i]
+            if not np.isfinite(lp):  # NaN, zero or negative pitch
+                continue
+            best, best_d = 0, abs(lp - log_freqs[0])
+            for q in range(1, k):
+                d = abs(lp - log_freqs[q])
+                if d < best_d:
+                    best, best_d = q, d
+            if best_d < threshold:
+                note_idx[m] = best
+                note_times[m] = times[i]
+                m += 1
+        group_times = np.empty(m, np.float64)
+        chord_masks = np.empty(m, np.int64)
+        g = i = 0
+        while i < m:
+            end_time = note_times[i] + window
+            mask = 0
+            j = i
+            while j < m and note_times[j] < end_time:
+                mask |= 1 << note_idx[j]
+                j += 1
+            group_times[g] = note_times[i]
+            chord_masks[g] = mask
+            g += 1
+            i = j
+        return group_times[:g], chord_masks[:g]
+else:
+    _classify_and_group = None
+
+# Global for progress tracking (swapped for a Manager dict shared with job workers in main())
 progress_data = {}
+# Conversion jobs run here when set up by main(); otherwise they run inside the request
+job_executor = None
 
 class SkyMusicConverter:
     def __init__(self):
@@ -199,6 +304,8 @@ class SkyMusicConverter:
         self.output_dir = Path("output")
         self.temp_dir.mkdir(exist_ok=True)
         self.output_dir.mkdir(exist_ok=True)
+        self.pitch_cache_dir = self.temp_dir / "pyin"
+        self.pitch_cache_dir.mkdir(exist_ok=True)
         self.sky_notes = {
             'A1': {'freq': 261.63, 'row':0,'col':0},
             'A2': {'freq': 293.66,'row':0,'col':1},
@@ -218,12 +325,16 @@ class SkyMusicConverter:
         }
         self.note_frequencies = [v['freq'] for v in self.sky_notes.values()]
         self.note_names = list(self.sky_notes.keys())
+        # Lookup arrays for pitch classification, built once instead of per pitch
+        self._note_freqs = np.asarray(self.note_frequencies, dtype=np.float32)
+        self._log_note_freqs = np.log2(self._note_freqs)
+        self._chord_names = {}  # chord bitmask -> sorted note names, filled as chords are seen
     def update_progress(self, job_id, percent, message, details=""):
         progress_data[job_id] = {'percent': percent, 'message': message, 'details': details, 'timestamp': time.time()}
         logger.info(f"Progress {job_id}: {percent}% - {message}")
     def download_youtube_audio(self, url, job_id):
         self.update_progress(job_id, 5, "Initializing Youtube downloader")
-        output_path = self.temp_dir / f"audio_{int(time.time())}"
+        output_path = self.temp_dir / f"audio_{job_id}"
         ydl_opts = {
             'format': 'bestaudio/best',
             'outtmpl': str(output_path) + '.%(ext)s',
@@ -251,75 +362,192 @@ class SkyMusicConverter:
             title = info.get('title', 'Unknown')
             duration = info.get('duration', 0)
             self.update_progress(job_id, 20, f"Found: {title}", f"Duration: {duration // 60}:{duration % 60:02d}, Starting download")
-            ydl.download([url])
+            y = self.stream_youtube_audio(ydl.sanitize_info(info), job_id)
+            if y is not None:
+                self.update_progress(job_id, 70, "Download and decoding completed")
+                return y, ANALYSIS_SR
+            # Streaming failed (e.g. unseekable container): download to disk, then decode.
+            # Reuses the extracted info instead of extracting the video again
+            self.update_progress(job_id, 25, "Streaming unavailable, downloading file")
+            ydl.process_ie_result(info, download=True)
         self.update_progress(job_id, 60, "Download completed, processing file")
-        downloaded_files = list(self.temp_dir.glob("audio_*"))
+        downloaded_files = list(self.temp_dir.glob(f"audio_{job_id}.*"))
         if not downloaded_files:
             raise FileNotFoundError("No audio file found after download")
         input_file = max(downloaded_files, key=lambda x: x.stat().st_mtime)
-        wav_path = input_file.with_suffix('.wav')
-        self.update_progress(job_id, 70, "Converting to WAV format")
-        audio = AudioSegment.from_file(str(input_file))
-        audio.export(str(wav_path), format="wav")
+        self.update_progress(job_id, 70, "Decoding audio")
+        y = self.decode_audio(input_file)
         try:
-            if input_file != wav_path:
-                input_file.unlink()
+            input_file.unlink()
         except:
             pass
-        return str(wav_path)
+        return y, ANALYSIS_SR
+    def stream_youtube_audio(self, info, job_id, sr=ANALYSIS_SR):
+        # yt-dlp writes the audio stream to stdout while ffmpeg decodes it, so decoding overlaps the download.
+        # The child loads the info already extracted in-process, so the video is not extracted twice
+        info_path = self.temp_dir / f"info_{job_id}.json"
+        try:
+            with open(info_path, 'w', encoding='utf-8') as f:
+                json.dump(info, f)
+            download_cmd = [sys.executable, '-m', 'yt_dlp', '-q', '--no-warnings',
+                            '--fragment-retries', '3', '-f', 'bestaudio/best', '-o', '-',
+                            '--load-info-json', str(info_path)]
+            downloader = subprocess.Popen(download_cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+            decoder = subprocess.Popen(self._decode_cmd('pipe:0', sr), stdin=downloader.stdout,
+                                       stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+            downloader.stdout.close()  # Decoder owns the read end now
+            pcm, _ = decoder.communicate()
+            if downloader.wait() != 0 or decoder.returncode != 0 or not pcm:
+                return None
+            return np.frombuffer(pcm, dtype=np.float32)
+        finally:
+            try:
+                info_path.unlink()
+            except OSError:
+                pass
+    def _decode_cmd(self, source, sr):
+        # Mono float32 PCM at the analysis rate on stdout
+        return [FFMPEG_CMD, '-loglevel', 'error', '-i', source, '-vn',
+                '-f', 'f32le', '-ac', '1', '-ar', str(sr), 'pipe:1']
+    def decode_audio(self, input_file, sr=ANALYSIS_SR):
+        # One ffmpeg pass straight to mono float32 PCM at the analysis rate, no intermediate WAV
+        result = subprocess.run(self._decode_cmd(str(input_file), sr), stdin=subprocess.DEVNULL,
+                                stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        if result.returncode != 0:
+            raise RuntimeError(f"ffmpeg failed to decode audio: {result.stderr.decode(errors='replace').strip()}")
+        if not result.stdout:
+            raise ValueError("No audio samples decoded")
+        return np.frombuffer(result.stdout, dtype=np.float32)
     def analyze_audio(self, audio_path, job_id):
         self.update_progress(job_id, 75, "Loading audio file")
-        y, sr = librosa.load(audio_path, sr=22050, mono=True)
+        # libsndfile reads WAV/FLAC/OGG directly; librosa.load (audioread) only for what it can't open
+        try:
+            y, sr = sf.read(audio_path, dtype='float32', always_2d=False)
+        except sf.LibsndfileError:
+            y, sr = librosa.load(audio_path, sr=ANALYSIS_SR, mono=True)
+        if y.ndim == 2:
+            y = y.mean(axis=1)
+        if sr != ANALYSIS_SR:
+            y = librosa.resample(y, orig_sr=sr, target_sr=ANALYSIS_SR)
+            sr = ANALYSIS_SR
+        return self.analyze_samples(y, sr, job_id)
+    def _pitch_cache_path(self, y, sr):
+        # Keyed by the decoded samples, so re-converting the same song (e.g. with a new title) hits
+        key = hashlib.blake2b(f"{PITCH_CACHE_VERSION}:{sr}:{FAST_PITCH_TRACKING}".encode(), digest_size=16)
+        key.update(np.ascontiguousarray(y))
+        return self.pitch_cache_dir / f"{key.hexdigest()}.npz"
+    def _prune_pitch_cache(self):
+        # Drop the oldest entries (by mtime, refreshed on every hit) once the cache is over its cap
+        entries = []
+        for f in self.pitch_cache_dir.glob("*.npz"):
+            try:
+                entries.append((f.stat().st_mtime, f))
+            except OSError:
+                pass  # Removed by a concurrent job
+        entries.sort()
+        for _, f in entries[:max(0, len(entries) - PITCH_CACHE_MAX_ENTRIES)]:
+            try:
+                f.unlink()
+            except OSError:
+                pass
+    def analyze_samples(self, y, sr, job_id):
         audio_duration = len(y) / sr
         self.update_progress(job_id, 80, "Analyzing audio properties", f"Loaded {audio_duration:.1f}s at {sr}Hz")
+        cache_path = self._pitch_cache_path(y, sr)
+        try:
+            with np.load(cache_path) as cached:
+                pitches, valid_times, tempo = cached['pitches'], cached['times'], float(cached['tempo'])
+            os.utime(cache_path)  # Mark as most recently used for eviction
+            self.update_progress(job_id, 95, "Analysis complete (cached)", f"Found {len(pitches)} pitches, tempo {tempo:.1f} BPM")
+            return pitches, valid_times, tempo
+        except (OSError, ValueError, KeyError):
+            pass
         self.update_progress(job_id, 85, "Detecting pitches with AI")
-        f0, voiced_flag, voiced_probs = librosa.pyin(y, fmin=librosa.note_to_hz('C4'), fmax=librosa.note_to_hz('C7'),
-                                                     sr=sr, frame_length=2048, hop_length=512,
-                                                     threshold=0.1, resolution=0.1)
-        self.update_progress(job_id, 88, "Filtering pitch data")
-        valid_indices = ~np.isnan(f0) & (voiced_probs > 0.7)
+        # Frame/hop sizes are halved with the sample rate, so window and time resolution are unchanged
+        fmin, fmax = librosa.note_to_hz('C4'), librosa.note_to_hz('C7')
+        frame_length, hop_length = 1024, 256
+        if FAST_PITCH_TRACKING:
+            f0 = librosa.yin(y, fmin=fmin, fmax=fmax, sr=sr, frame_length=frame_length, hop_length=hop_length)
+            # YIN has no voicing decision, so keep only frames with real signal energy
+            rms = librosa.feature.rms(y=y, frame_length=frame_length, hop_length=hop_length)[0]
+            self.update_progress(job_id, 88, "Filtering pitch data")
+            valid_indices = np.isfinite(f0) & (rms[:len(f0)] > 0.1 * rms.max())
+        else:
+            f0, voiced_flag, voiced_probs = librosa.pyin(y, fmin=fmin, fmax=fmax, sr=sr,
+                                                         frame_length=frame_length, hop_length=hop_length,
+                                                         resolution=0.25)
+            self.update_progress(job_id, 88, "Filtering pitch data")
+            valid_indices = ~np.isnan(f0) & (voiced_probs > 0.7)
         if not valid_indices.any():
             raise ValueError("No reliable pitches detected")
-        pitches = f0[valid_indices]
-        tempo, _ = librosa.beat.beat_track(y=y, sr=sr)
-        hop_length = 512
+        # Note mapping only needs ~cent accuracy; float32 halves the bandwidth of the classification pass
+        pitches = f0[valid_indices].astype(np.float32, copy=False)
+        # Only the tempo scalar is used, so skip beat tracking's dynamic programming and estimate it
+        # straight from the onset envelope, at the same hop (frame rate) as the pitch track
+        onset_env = librosa.onset.onset_strength(y=y, sr=sr, hop_length=hop_length)
+        tempo = librosa.feature.tempo(onset_envelope=onset_env, sr=sr, hop_length=hop_length)[0]
         times = librosa.frames_to_time(np.arange(len(f0)), sr=sr, hop_length=hop_length)
         valid_times = times[valid_indices]
+        try:
+            # Write under a per-process name and rename, so concurrent jobs never read a partial file
+            partial = cache_path.with_name(f"{cache_path.stem}.{os.getpid()}.npz")
+            np.savez_compressed(partial, pitches=pitches, times=valid_times, tempo=tempo)
+            os.replace(partial, cache_path)
+            self._prune_pitch_cache()
+        except OSError as e:
+            logger.warning(f"Could not cache pitch analysis: {e}")
         self.update_progress(job_id, 95, "Analysis complete", f"Found {len(pitches)} pitches, tempo {tempo:.1f} BPM")
         return pitches, valid_times, float(tempo)
     def pitch_to_sky_note(self, frequency):
         if frequency <= 0 or np.isnan(frequency):
             return None
-        freq_ratios = np.abs(np.log2(frequency / np.array(self.note_frequencies)))
-        closest_idx = np.argmin(freq_ratios)
+        freq_ratios = np.abs(np.log2(np.float32(frequency)) - self._log_note_freqs)
+        closest_idx = int(np.argmin(freq_ratios))
         if freq_ratios[closest_idx] < 0.5:
             return self.note_names[closest_idx]
         return None
+    def _classify_and_group_notes(self, pitches, times):
+        # Nearest Sky note by distance in octaves (< 0.5), then notes within 0.1s of a group's first note form one chord
+        if _classify_and_group is not None:
+            with np.errstate(divide='ignore', invalid='ignore'):
+                log_pitches = np.log2(pitches)
+            group_times, chord_masks = _classify_and_group(log_pitches, times, self._log_note_freqs, 0.5, 0.1)
+        else:
+            usable = np.isfinite(pitches) & (pitches > 0)
+            pitches, times = pitches[usable], times[usable]
+            diffs = np.abs(np.log2(pitches)[:, None] - self._log_note_freqs[None, :])
+            idx = diffs.argmin(axis=1)
+            valid = diffs[np.arange(len(idx)), idx] < 0.5
+            note_idx, note_times = idx[valid], times[valid]
+            if not len(note_idx):
+                return []
+            # ends[i] is where the chord window starting at note i stops; walk them to find group starts
+            ends = np.searchsorted(note_times, note_times + 0.1, side='left').tolist()
+            starts = []
+            i = 0
+            while i < len(ends):
+                starts.append(i)
+                i = ends[i]
+            group_times = note_times[starts]
+            chord_masks = np.bitwise_or.reduceat(np.left_shift(1, note_idx), starts)
+        # Bit q set == note q in the chord; decoding in index order gives sorted, de-duplicated names
+        chord_names, names = self._chord_names, self.note_names
+        processed_notes = []
+        for t, mask in zip(group_times.tolist(), chord_masks.tolist()):
+            notes = chord_names.get(mask)
+            if notes is None:
+                notes = chord_names[mask] = [name for q, name in enumerate(names) if (mask >> q) & 1]
+            processed_notes.append({"time": t, "notes": notes, "duration": 0.5})
+        return processed_notes
     def convert_to_sky_sheet(self, pitches, times, tempo, title, job_id):
         self.update_progress(job_id, 96, "Converting to Sky Music format")
-        sky_notes = []
-        for i, (pitch, time_val) in enumerate(zip(pitches, times)):
-            note = self.pitch_to_sky_note(pitch)
-            if note:
-                sky_notes.append({"note": note, "time": float(time_val), "duration": 0.5})
-            if i % 100 == 0:
-                progress = 96 + int((i / len(pitches)) * 2)
-                self.update_progress(job_id, progress, f"Processing notes: {i}/{len(pitches)}")
-        if not sky_notes:
+        pitches = np.asarray(pitches, dtype=np.float32)
+        times = np.asarray(times, dtype=np.float64)
+        self.update_progress(job_id, 97, f"Processing notes: {len(pitches)}/{len(pitches)}")
+        processed_notes = self._classify_and_group_notes(pitches, times)
+        if not processed_notes:
             raise ValueError("No valid Sky notes detected")
         self.update_progress(job_id, 98, "Optimizing note sequence")
-        processed_notes = []
-        i = 0
-        while i < len(sky_notes):
-            current_time = sky_notes[i]['time']
-            chord_notes = [sky_notes[i]['note']]
-            j = i+1
-            while j < len(sky_notes) and sky_notes[j]['time'] - current_time < 0.1:
-                chord_notes.append(sky_notes[j]['note'])
-                j += 1
-            chord_notes = sorted(list(set(chord_notes)))
-            processed_notes.append({"time": current_time, "notes": chord_notes, "duration": 0.5})
-            i = j
         self.update_progress(job_id, 99, "Generating JSON output")
         sky_sheet = {
             "name": title,
@@ -330,25 +558,26 @@ class SkyMusicConverter:
             "pitchLevel": 0,
             "isComposed": True,
             "isEncrypted": False,
-            "songNotes": []
+            # One entry per note; chord members share their group's time
+            "songNotes": [{"key": note, "time": group["time"]}
+                          for group in processed_notes for note in group["notes"]]
         }
-        for group in processed_notes:
-            if len(group["notes"]) == 1:
-                sky_sheet["songNotes"].append({"key": group["notes"][0], "time": group["time"]})
-            else:
-                for note in group["notes"]:
-                    sky_sheet["songNotes"].append({"key": note, "time": group["time"]})
         self.update_progress(job_id, 100, "Conversion complete", f"Generated {len(sky_sheet['songNotes'])} notes")
         return sky_sheet
     def save_sheet(self, sheet_data, filename):
         output_path = self.output_dir / f"{filename}.json"
-        with open(output_path, "w", encoding="utf-8") as f:
-            json.dump(sheet_data, f, indent=2, ensure_ascii=False)
+        if orjson is not None:
+            with open(output_path, "wb") as f:
+                f.write(orjson.dumps(sheet_data, option=orjson.OPT_INDENT_2))
+        else:
+            with open(output_path, "w", encoding="utf-8") as f:
+                json.dump(sheet_data, f, indent=2, ensure_ascii=False)
         logger.info(f"Saved sheet to {output_path}")
         return str(output_path)
-    def cleanup_temp_files(self):
+    def cleanup_temp_files(self, job_id=None):
+        # Concurrent jobs share temp_dir, so a finished job only removes its own files
         try:
-            for f in self.temp_dir.glob("*"):
+            for f in self.temp_dir.glob(f"*_{job_id}.*" if job_id else "*"):
                 if f.is_file():
                     try:
                         f.unlink()
@@ -364,6 +593,10 @@ CORS(app)
 
 converter = SkyMusicConverter()
 
+def json_response(data, status=200):
+    body = orjson.dumps(data) if orjson is not None else json.dumps(data, ensure_ascii=False)
+    return app.response_class(body, status=status, mimetype='application/json')
+
 # Minimal clean HTML UI
 HTML_TEMPLATE = \"\"\"<!DOCTYPE html>
 <html lang=\"en\">
@@ -424,54 +657,98 @@ def index():
 
 @app.route("/progress/<job_id>")
 def progress(job_id):
-    return jsonify(progress_data.get(job_id, {'percent':0,'message':'Job not found','details':''}))
+    return json_response(progress_data.get(job_id, {'percent':0,'message':'Job not found','details':''}))
+
+class _FilenameCharTable(dict):
+    # str.translate table for sheet file names: keeps alphanumerics, space, '-' and '_'.
+    # Filled lazily per code point, so only characters actually seen are ever classified.
+    def __missing__(self, codepoint):
+        ch = chr(codepoint)
+        self[codepoint] = repl = ch if ch.isalnum() or ch in ' -_' else None
+        return repl
+
+_FILENAME_CHARS = _FilenameCharTable()
+
+def safe_filename(title):
+    return title.translate(_FILENAME_CHARS).strip()
+
+def _init_job_worker(shared_progress):
+    global progress_data
+    progress_data = shared_progress
+
+def _finish_job(title, sheet):
+    output_path = converter.save_sheet(sheet, safe_filename(title))
+    return {'success': True, 'title': title, 'download_url': f'/download/{Path(output_path).name}', 'notes_count': len(sheet['songNotes'])}
+
+def _record_result(job_id, result):
+    # Pollers pick the final response up from /progress once the job is done
+    progress_data[job_id] = {**progress_data.get(job_id, {}), 'result': result}
+    return result
+
+def run_youtube_job(url, title, job_id):
+    try:
+        y, sr = converter.download_youtube_audio(url, job_id)
+        pitches, times, tempo = converter.analyze_samples(y, sr, job_id)
+        sheet = converter.convert_to_sky_sheet(pitches, times, tempo, title, job_id)
+        result = _finish_job(title, sheet)
+    except Exception as e:
+        result = {'success': False, 'error': str(e)}
+    converter.cleanup_temp_files(job_id)
+    return _record_result(job_id, result)
+
+def run_file_job(audio_path, title, job_id):
+    try:
+        if Path(audio_path).suffix.lower() in ('.wav', '.flac', '.ogg'):
+            # libsndfile reads these directly
+            pitches, times, tempo = converter.analyze_audio(audio_path, job_id)
+        else:
+            # Everything else is decoded (and resampled) by ffmpeg in one pass, no WAV round-trip
+            converter.update_progress(job_id, 70, "Decoding audio")
+            y = converter.decode_audio(audio_path)
+            pitches, times, tempo = converter.analyze_samples(y, ANALYSIS_SR, job_id)
+        sheet = converter.convert_to_sky_sheet(pitches, times, tempo, title, job_id)
+        result = _finish_job(title, sheet)
+    except Exception as e:
+        result = {'success': False, 'error': str(e)}
+    converter.cleanup_temp_files(job_id)
+    return _record_result(job_id, result)
+
+def _job_id(requested):
+    # Job ids end up in temp file names, so only accept plain ones from the client
+    if requested and re.fullmatch(r'[A-Za-z0-9_-]{1,64}', requested):
+        return requested
+    return str(uuid.uuid4())
+
+def _dispatch(job, *args):
+    job_id = args[-1]
+    if job_executor is None:
+        result = job(*args)
+        return json_response(result, 200 if result['success'] else 500)
+    job_executor.submit(job, *args)
+    return json_response({'success': True, 'job_id': job_id, 'status_url': f'/progress/{job_id}'}, 202)
 
 @app.route("/convert/youtube", methods=["POST"])
 def convert_youtube():
     data = request.get_json()
     url = data.get("url")
     title = data.get("title", "YouTube Song")
-    job_id = data.get("job_id", str(uuid.uuid4()))
-    try:
-        converter.update_progress(job_id, 1, "Starting YouTube conversion")
-        audio_path = converter.download_youtube_audio(url, job_id)
-        pitches, times, tempo = converter.analyze_audio(audio_path, job_id)
-        sheet = converter.convert_to_sky_sheet(pitches, times, tempo, title, job_id)
-        safe_name = "".join(c for c in title if c.isalnum() or c in (' ', '-', '_')).strip()
-        output_path = converter.save_sheet(sheet, safe_name)
-        converter.cleanup_temp_files()
-        return jsonify({'success': True, 'title': title, 'download_url': f'/download/{Path(output_path).name}', 'notes_count': len(sheet['songNotes'])})
-    except Exception as e:
-        converter.cleanup_temp_files()
-        return jsonify({'success': False, 'error': str(e)}), 500
+    job_id = _job_id(data.get("job_id"))
+    converter.update_progress(job_id, 1, "Starting YouTube conversion")
+    return _dispatch(run_youtube_job, url, title, job_id)
 
 @app.route("/convert/file", methods=["POST"])
 def convert_file():
     audio_file = request.files.get("audio")
     title = request.form.get("title", "Audio File")
-    job_id = request.form.get("job_id", str(uuid.uuid4()))
+    job_id = _job_id(request.form.get("job_id"))
     if not audio_file:
-        return jsonify({'success': False, 'error': 'No audio file provided'}), 400
-    try:
-        converter.update_progress(job_id, 1, "Starting file conversion", f"Processing {audio_file.filename}")
-        temp_path = converter.temp_dir / f"upload_{int(time.time())}.{audio_file.filename.split('.')[-1]}"
-        audio_file.save(str(temp_path))
-        converter.update_progress(job_id, 10, "File uploaded", "Converting to WAV if needed")
-        if temp_path.suffix.lower() != '.wav':
-            wav_path = temp_path.with_suffix('.wav')
-            audio = AudioSegment.from_file(str(temp_path))
-            audio.export(str(wav_path), format="wav")
-            temp_path.unlink()
-            temp_path = wav_path
-        pitches, times, tempo = converter.analyze_audio(str(temp_path), job_id)
-        sheet = converter.convert_to_sky_sheet(pitches, times, tempo, title, job_id)
-        safe_name = "".join(c for c in title if c.isalnum() or c in (' ', '-', '_')).strip()
-        output_path = converter.save_sheet(sheet, safe_name)
-        converter.cleanup_temp_files()
-        return jsonify({'success': True, 'title': title, 'download_url': f'/download/{Path(output_path).name}', 'notes_count': len(sheet['songNotes'])})
-    except Exception as e:
-        converter.cleanup_temp_files()
-        return jsonify({'success': False, 'error': str(e)}), 500
+        return json_response({'success': False, 'error': 'No audio file provided'}, 400)
+    converter.update_progress(job_id, 1, "Starting file conversion", f"Processing {audio_file.filename}")
+    # The upload has to be on disk before the request returns; the job only gets its path
+    temp_path = converter.temp_dir / f"upload_{job_id}.{audio_file.filename.split('.')[-1]}"
+    audio_file.save(str(temp_path))
+    converter.update_progress(job_id, 10, "File uploaded", "Queued for decoding")
+    return _dispatch(run_file_job, str(temp_path), title, job_id)
 
 @app.route("/download/<filename>")
 def download(filename):
@@ -490,11 +767,23 @@ def main():
         if resp != "y":
             sys.exit(1)
     check_and_install_dependencies()
-    global converter
+    global converter, progress_data, job_executor
     converter = SkyMusicConverter()
+    # Analysis is CPU-bound; run jobs in worker processes, leaving room for each job's own BLAS/FFT threads
+    progress_data = Manager().dict()
+    job_executor = ProcessPoolExecutor(max_workers=max(1, (os.cpu_count() or 1) // 2),
+                                       initializer=_init_job_worker, initargs=(progress_data,))
     print("✅ Setup complete! Open browser: http://localhost:5000")
-    from werkzeug.serving import run_simple
-    run_simple("0.0.0.0", 5000, app)
+    # Threaded WSGI server so concurrent conversions and progress polls don't queue behind each other;
+    # a single process keeps progress_data shared between the converting and polling requests
+    threads = max(4, os.cpu_count() or 1)
+    try:
+        from waitress import serve
+    except ImportError:
+        from werkzeug.serving import run_simple
+        run_simple("0.0.0.0", 5000, app, threaded=True)
+    else:
+        serve(app, host="0.0.0.0", port=5000, threads=threads)
 
 if __name__ == "__main__":
     main()
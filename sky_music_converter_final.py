@@ -17,6 +17,7 @@ import json
 import logging
 import traceback
 import subprocess
+import importlib.util
 from pathlib import Path
 from datetime import datetime
 import tempfile
@@ -28,22 +29,46 @@ import uuid
 import platform
 import zipfile
 import requests
+from requests.adapters import HTTPAdapter
 from urllib.parse import urlparse
+from concurrent.futures import ThreadPoolExecutor
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(levelname)s:%(name)s:%(message)s')
 logger = logging.getLogger(__name__)
 
+# FFmpeg and dependency setup run on separate threads at startup; keep their output lines whole
+_print_lock = threading.Lock()
+
+def safe_print(*args, **kwargs):
+    """print() serialized across the startup threads"""
+    with _print_lock:
+        print(*args, **kwargs)
+
+# Download chunk size: large reads keep the ~100 MB FFmpeg zip from waking
+# Python thousands of times per second
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+
+_http_session: Optional[requests.Session] = None
+
+def get_http_session() -> requests.Session:
+    """Shared keep-alive session with retries for installer downloads"""
+    global _http_session
+    if _http_session is None:
+        _http_session = requests.Session()
+        _http_session.mount('https://', HTTPAdapter(pool_connections=1, pool_maxsize=10, max_retries=3))
+    return _http_session
+
 def download_file(url: str, destination: Path, progress_callback=None):
     """Download a file with progress tracking"""
-    response = requests.get(url, stream=True)
+    response = get_http_session().get(url, stream=True)
     response.raise_for_status()
     
     total_size = int(response.headers.get('content-length', 0))
     downloaded = 0
     
     with open(destination, 'wb') as f:
-        for chunk in response.iter_content(chunk_size=8192):
+        for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
             if chunk:
                 f.write(chunk)
                 downloaded += len(chunk)
@@ -75,9 +100,9 @@ def add_to_path_windows(directory: str):
             # Add directory to PATH
             new_path = f"{current_path};{directory}" if current_path else directory
             winreg.SetValueEx(key, "PATH", 0, winreg.REG_EXPAND_SZ, new_path)
-            print(f"✅ Added {directory} to PATH")
+            safe_print(f"✅ Added {directory} to PATH")
         else:
-            print(f"✅ {directory} already in PATH")
+            safe_print(f"✅ {directory} already in PATH")
         
         winreg.CloseKey(key)
         
@@ -106,12 +131,41 @@ def add_to_path_windows(directory: str):
         return True
         
     except Exception as e:
-        print(f"❌ Failed to add to PATH: {e}")
+        safe_print(f"❌ Failed to add to PATH: {e}")
         return False
 
+def fetch_latest_ffmpeg_release() -> Dict:
+    """Fetch the latest BtbN FFmpeg release metadata, revalidating a cached copy by ETag"""
+    api_url = "https://api.github.com/repos/BtbN/FFmpeg-Builds/releases/latest"
+    cache_dir = Path(tempfile.gettempdir())
+    etag_path = cache_dir / "ffmpeg_release.etag"
+    json_path = cache_dir / "ffmpeg_release.json"
+    
+    # Conditional GET: a 304 reply is cheap and doesn't count against GitHub's
+    # unauthenticated rate limit, which matters when the installer is re-run
+    headers = {}
+    if etag_path.exists() and json_path.exists():
+        headers['If-None-Match'] = etag_path.read_text().strip()
+    
+    response = get_http_session().get(api_url, headers=headers)
+    if response.status_code == 304:
+        with open(json_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    response.raise_for_status()
+    
+    etag = response.headers.get('ETag')
+    if etag:
+        try:
+            json_path.write_bytes(response.content)
+            etag_path.write_text(etag)
+        except OSError:
+            pass  # Caching is best effort
+    
+    return response.json()
+
 def install_ffmpeg_windows():
     """Automatically download and install FFmpeg on Windows"""
-    print("🔄 Auto-installing FFmpeg for Windows...")
+    safe_print("🔄 Auto-installing FFmpeg for Windows...")
     
     # FFmpeg installation directory
     ffmpeg_dir = Path("C:/ffmpeg")
@@ -119,19 +173,15 @@ def install_ffmpeg_windows():
     
     # Check if already installed
     if ffmpeg_bin.exists() and (ffmpeg_bin / "ffmpeg.exe").exists():
-        print("✅ FFmpeg already installed at C:/ffmpeg/bin")
+        safe_print("✅ FFmpeg already installed at C:/ffmpeg/bin")
         add_to_path_windows(str(ffmpeg_bin))
         return True
     
     try:
-        print("📥 Downloading FFmpeg...")
+        safe_print("📥 Downloading FFmpeg...")
         
         # Get latest FFmpeg release URL
-        api_url = "https://api.github.com/repos/BtbN/FFmpeg-Builds/releases/latest"
-        response = requests.get(api_url)
-        response.raise_for_status()
-        
-        release_data = response.json()
+        release_data = fetch_latest_ffmpeg_release()
         
         # Find Windows x64 GPL build
         download_url = None
@@ -149,17 +199,21 @@ def install_ffmpeg_windows():
         
         zip_path = temp_dir / "ffmpeg.zip"
         
-        print(f"📥 Downloading from: {download_url}")
-        print("⏳ This may take a few minutes...")
+        safe_print(f"📥 Downloading from: {download_url}")
+        safe_print("⏳ This may take a few minutes...")
+        
+        last_reported = [0.0]
         
         def progress_callback(progress):
-            if progress % 10 < 1:  # Print every 10%
-                print(f"📥 Download progress: {progress:.1f}%")
+            # Print on every 5% step; 1 MiB chunks can jump past a fixed window
+            if progress - last_reported[0] >= 5 or progress >= 100:
+                last_reported[0] = progress
+                safe_print(f"📥 Download progress: {progress:.1f}%")
         
         download_file(download_url, zip_path, progress_callback)
-        print("✅ Download completed!")
+        safe_print("✅ Download completed!")
         
-        print("📂 Extracting FFmpeg...")
+        safe_print("📂 Extracting FFmpeg...")
         
         # Extract zip file
         with zipfile.ZipFile(zip_path, 'r') as zip_ref:
@@ -167,41 +221,44 @@ def install_ffmpeg_windows():
             zip_contents = zip_ref.namelist()
             main_folder = zip_contents[0].split('/')[0]
             
-            # Extract all files
-            zip_ref.extractall(temp_dir)
+            # Extract only the executables; docs, headers and lib/ are not needed
+            for info in zip_ref.infolist():
+                if '/bin/' in info.filename or info.filename.endswith('.exe'):
+                    zip_ref.extract(info, temp_dir)
         
-        # Move extracted folder to C:/ffmpeg
-        extracted_path = temp_dir / main_folder
+        # Move extracted bin folder to C:/ffmpeg/bin
+        extracted_bin = temp_dir / main_folder / "bin"
         
         # Remove existing ffmpeg directory if it exists
         if ffmpeg_dir.exists():
             shutil.rmtree(ffmpeg_dir)
+        ffmpeg_dir.mkdir(parents=True)
         
-        # Move extracted folder to final location
-        shutil.move(str(extracted_path), str(ffmpeg_dir))
+        # Move extracted binaries to final location
+        shutil.move(str(extracted_bin), str(ffmpeg_bin))
         
-        print("✅ FFmpeg extracted to C:/ffmpeg")
+        safe_print("✅ FFmpeg extracted to C:/ffmpeg")
         
         # Add to PATH
         if add_to_path_windows(str(ffmpeg_bin)):
-            print("✅ FFmpeg added to system PATH")
+            safe_print("✅ FFmpeg added to system PATH")
         else:
-            print("⚠️  Could not add to PATH automatically")
+            safe_print("⚠️  Could not add to PATH automatically")
         
         # Cleanup
         shutil.rmtree(temp_dir, ignore_errors=True)
         
-        print("🎉 FFmpeg installation completed!")
-        print("🔄 Please restart your command prompt for PATH changes to take effect")
+        safe_print("🎉 FFmpeg installation completed!")
+        safe_print("🔄 Please restart your command prompt for PATH changes to take effect")
         
         return True
         
     except Exception as e:
-        print(f"❌ FFmpeg installation failed: {e}")
-        print("Please install FFmpeg manually following these steps:")
-        print("1. Download from: https://github.com/BtbN/FFmpeg-Builds/releases")
-        print("2. Extract to C:/ffmpeg/")
-        print("3. Add C:/ffmpeg/bin to your system PATH")
+        safe_print(f"❌ FFmpeg installation failed: {e}")
+        safe_print("Please install FFmpeg manually following these steps:")
+        safe_print("1. Download from: https://github.com/BtbN/FFmpeg-Builds/releases")
+        safe_print("2. Extract to C:/ffmpeg/")
+        safe_print("3. Add C:/ffmpeg/bin to your system PATH")
         return False
 
 def check_ffmpeg():
@@ -209,13 +266,13 @@ def check_ffmpeg():
     try:
         subprocess.run(['ffmpeg', '-version'], capture_output=True, check=True)
         subprocess.run(['ffprobe', '-version'], capture_output=True, check=True)
-        print("✅ FFmpeg is installed and working")
+        safe_print("✅ FFmpeg is installed and working")
         return True
     except (subprocess.CalledProcessError, FileNotFoundError):
-        print("❌ FFmpeg not found!")
+        safe_print("❌ FFmpeg not found!")
         
         if platform.system() == "Windows":
-            print("🤖 Attempting automatic installation...")
+            safe_print("🤖 Attempting automatic installation...")
             
             try:
                 import winreg
@@ -223,16 +280,16 @@ def check_ffmpeg():
                 # Required modules available, proceed with auto-install
                 return install_ffmpeg_windows()
             except ImportError:
-                print("❌ Cannot auto-install: Required Windows modules not available")
+                safe_print("❌ Cannot auto-install: Required Windows modules not available")
         else:
-            print("\n🔧 Manual Installation Instructions:")
+            safe_print("\n🔧 Manual Installation Instructions:")
             if platform.system() == "Darwin":  # macOS
-                print("Run: brew install ffmpeg")
+                safe_print("Run: brew install ffmpeg")
             else:  # Linux
-                print("Run: sudo apt-get install ffmpeg  (Ubuntu/Debian)")
-                print("Or: sudo yum install ffmpeg     (CentOS/RHEL)")
+                safe_print("Run: sudo apt-get install ffmpeg  (Ubuntu/Debian)")
+                safe_print("Or: sudo yum install ffmpeg     (CentOS/RHEL)")
         
-        print("\n⚠️  FFmpeg is required for audio processing.")
+        safe_print("\n⚠️  FFmpeg is required for audio processing.")
         return False
 
 def check_and_install_dependencies():
@@ -245,77 +302,136 @@ def check_and_install_dependencies():
         'flask': '>=3.0.0',
         'flask-cors': '>=4.0.0',
         'requests': '>=2.31.0',
-        'soundfile': '>=0.12.1',
-        'pydub': '>=0.25.1'
+        'soundfile': '>=0.12.1'
     }
     
-    print("🔍 Checking Python dependencies...")
+    # Import names that differ from the pip distribution name
+    module_names = {
+        'yt-dlp': 'yt_dlp',
+        'flask-cors': 'flask_cors'
+    }
+    
+    safe_print("🔍 Checking Python dependencies...")
     missing_packages = []
     
     for package, version in dependencies.items():
-        try:
-            if package == 'yt-dlp':
-                import yt_dlp
-            elif package == 'flask-cors':
-                from flask_cors import CORS
-            elif package == 'soundfile':
-                import soundfile
-            elif package == 'pydub':
-                from pydub import AudioSegment
-            else:
-                __import__(package)
-            print(f"✅ {package} is available")
-        except ImportError:
+        # find_spec only locates the module; importing librosa here would
+        # pull in numba/scipy and cost seconds before the real imports below
+        module_name = module_names.get(package, package)
+        if importlib.util.find_spec(module_name) is not None:
+            safe_print(f"✅ {package} is available")
+        else:
             missing_packages.append(package)
-            print(f"❌ {package} not found")
+            safe_print(f"❌ {package} not found")
     
     if missing_packages:
-        print(f"📦 Installing missing packages: {', '.join(missing_packages)}")
+        safe_print(f"📦 Installing missing packages: {', '.join(missing_packages)}")
+        # One pip run resolves and downloads everything together instead of
+        # paying interpreter startup and index lookups once per package
+        specs = [f'{package}{dependencies[package]}' for package in missing_packages]
+        try:
+            install_cmd = [sys.executable, '-m', 'pip', 'install', '--prefer-binary', *specs]
+            subprocess.check_call(install_cmd)
+        except subprocess.CalledProcessError as e:
+            safe_print(f"❌ Failed to install {', '.join(missing_packages)}: {e}")
+            return False
         for package in missing_packages:
-            try:
-                version_spec = dependencies[package]
-                install_cmd = [sys.executable, '-m', 'pip', 'install', f'{package}{version_spec}']
-                subprocess.check_call(install_cmd)
-                print(f"✅ Successfully installed {package}")
-            except subprocess.CalledProcessError as e:
-                print(f"❌ Failed to install {package}: {e}")
-                return False
+            safe_print(f"✅ Successfully installed {package}")
     
-    print("✅ All Python dependencies installed!")
+    safe_print("✅ All Python dependencies installed!")
     return True
 
-# Check and install FFmpeg automatically
-print("🔧 Checking FFmpeg installation...")
-ffmpeg_ready = check_ffmpeg()
+# Check and install FFmpeg and Python dependencies concurrently; both are
+# network-bound (FFmpeg zip download vs. pip) and independent of each other
+print("🔧 Checking FFmpeg installation and Python dependencies...")
+with ThreadPoolExecutor(max_workers=2) as startup_executor:
+    ffmpeg_future = startup_executor.submit(check_ffmpeg)
+    deps_future = startup_executor.submit(check_and_install_dependencies)
+    ffmpeg_ready, deps_ready = ffmpeg_future.result(), deps_future.result()
+
+if not deps_ready:
+    sys.exit(1)
 
+# Prompt only after both threads are done so their output can't interleave with input()
 if not ffmpeg_ready:
     print("\n❌ FFmpeg installation required for audio processing")
     response = input("Continue anyway? (y/N): ").strip().lower()
     if response != 'y':
         sys.exit(1)
 
-# Install Python dependencies
-if not check_and_install_dependencies():
-    sys.exit(1)
-
 # Now import the packages
 import numpy as np
 import librosa
 import yt_dlp
-from flask import Flask, request, jsonify, render_template_string, send_file
+from flask import Flask, Response, request, jsonify, send_file
 from flask_cors import CORS
 import soundfile as sf
-from pydub import AudioSegment
 
-# Configure FFmpeg paths for pydub
+# Optional C-accelerated JSON writer for large sheets; stdlib json is the fallback
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Optional native pitch-to-note kernel; numba normally comes with librosa
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+if njit is not None:
+    @njit(cache=True, fastmath=True, boundscheck=False)
+    def _map_pitches(pitches, log_notes, tolerance):
+        """Index of the nearest note (in octaves) for each pitch, or -1 if none is within tolerance.
+        
+        Pitches must be finite and positive. One fused pass: no (pitches x notes) distance matrix.
+        """
+        out = np.full(pitches.shape[0], -1, np.int8)
+        for i in range(pitches.shape[0]):
+            log_p = np.log2(pitches[i])
+            best = 0
+            best_dist = abs(log_p - log_notes[0])
+            for j in range(1, log_notes.shape[0]):
+                dist = abs(log_p - log_notes[j])
+                if dist < best_dist:
+                    best_dist = dist
+                    best = j
+            if best_dist < tolerance:
+                out[i] = best
+        return out
+else:
+    _map_pitches = None
+
+# Configure FFmpeg paths
 ffmpeg_path = r"C:\ffmpeg\bin\ffmpeg.exe"
 ffprobe_path = r"C:\ffmpeg\bin\ffprobe.exe"
 
-# Set environment variables and configure pydub
+# Set environment variables for tools that look them up
 os.environ["FFMPEG_BINARY"] = ffmpeg_path
 os.environ["FFPROBE_BINARY"] = ffprobe_path
-AudioSegment.converter = ffmpeg_path
-AudioSegment.ffprobe = ffprobe_path
+
+# Binary used for WAV conversion: the auto-installed copy if present, otherwise whatever is on PATH
+FFMPEG_BINARY = ffmpeg_path if os.path.exists(ffmpeg_path) else 'ffmpeg'
+
+# Pitch tracker used by analyze_audio:
+#   'yin'   - plain YIN with an energy gate; no HMM decoding, several times faster than pYIN
+#   'pyin'  - probabilistic YIN with Viterbi smoothing; slowest, most robust voicing decisions
+#   'crepe' - torchcrepe CNN (GPU when available); needs torch + torchcrepe installed
+PITCH_TRACKER = 'yin'
+
+# Analysis audio format. 16 kHz still resolves the short periods of the top keys (below it YIN
+# slips octaves on C6-E6) with ~1.4x fewer samples than 22.05 kHz; tests/test_final_pitch.py
+# checks it against the 22.05 kHz framing. The hop keeps the old ~23 ms frame spacing.
+ANALYSIS_SR = 16000
+FRAME_LENGTH = 1024  # 64 ms, over a dozen periods even at C4
+HOP_LENGTH = 372
+
+# Tracked pitch range, C4..C7 (librosa.note_to_hz('C4') / ('C7')) precomputed
+FMIN_HZ = 261.6255653005986
+FMAX_HZ = 2093.004522404789
+
+# Minimum seconds between logged progress lines for the same job
+PROGRESS_LOG_INTERVAL = 0.1
 
 # Global progress tracking
 progress_data = {}
@@ -323,34 +439,27 @@ progress_data = {}
 class SkyMusicConverter:
     """Sky Music Converter with automated setup"""
     
+    # Sky Music note mapping (15-key layout), stored as parallel arrays shared by all instances.
+    # Keys run row by row, 5 per row, so a key's grid position is divmod(index, 5).
+    _NOTE_NAMES = np.array([
+        'A1', 'A2', 'A3', 'A4', 'A5',
+        'B1', 'B2', 'B3', 'B4', 'B5',
+        'C1', 'C2', 'C3', 'C4', 'C5'
+    ])
+    _NOTE_FREQS = np.array([
+        261.63, 293.66, 329.63, 369.99, 415.30,    # C4  D4  E4  F#4 G#4
+        466.16, 523.25, 587.33, 659.25, 739.99,    # A#4 C5  D5  E5  F#5
+        830.61, 932.33, 1046.50, 1174.66, 1318.51  # G#5 A#5 C6  D6  E6
+    ], dtype=np.float32)
+    _LOG_NOTE_FREQS = np.log2(_NOTE_FREQS)
+    
     def __init__(self):
         self.temp_dir = Path(tempfile.gettempdir()) / "sky_music_converter"
         self.output_dir = Path("output")
         self.create_directories()
         
-        # Sky Music note mapping (15-key layout)
-        self.sky_notes = {
-            'A1': {'freq': 261.63, 'row': 0, 'col': 0},  # C4
-            'A2': {'freq': 293.66, 'row': 0, 'col': 1},  # D4
-            'A3': {'freq': 329.63, 'row': 0, 'col': 2},  # E4
-            'A4': {'freq': 369.99, 'row': 0, 'col': 3},  # F#4
-            'A5': {'freq': 415.30, 'row': 0, 'col': 4},  # G#4
-            
-            'B1': {'freq': 466.16, 'row': 1, 'col': 0},  # A#4
-            'B2': {'freq': 523.25, 'row': 1, 'col': 1},  # C5
-            'B3': {'freq': 587.33, 'row': 1, 'col': 2},  # D5
-            'B4': {'freq': 659.25, 'row': 1, 'col': 3},  # E5
-            'B5': {'freq': 739.99, 'row': 1, 'col': 4},  # F#5
-            
-            'C1': {'freq': 830.61, 'row': 2, 'col': 0},  # G#5
-            'C2': {'freq': 932.33, 'row': 2, 'col': 1},  # A#5
-            'C3': {'freq': 1046.50, 'row': 2, 'col': 2}, # C6
-            'C4': {'freq': 1174.66, 'row': 2, 'col': 3}, # D6
-            'C5': {'freq': 1318.51, 'row': 2, 'col': 4}  # E6
-        }
-        
-        self.note_frequencies = [note['freq'] for note in self.sky_notes.values()]
-        self.note_names = list(self.sky_notes.keys())
+        # Last time a progress line was logged per job (monotonic seconds)
+        self._last_log_ts: Dict[str, float] = {}
     
     def create_directories(self):
         """Create necessary directories"""
@@ -366,7 +475,16 @@ class SkyMusicConverter:
             'details': details,
             'timestamp': time.time()
         }
-        logger.info(f"Progress {job_id}: {percent}% - {message}")
+        
+        # Throttle the log line to one per PROGRESS_LOG_INTERVAL per job; failures (0%)
+        # and completion always get logged, and end the job's throttle entry
+        now = time.monotonic()
+        finished = percent == 0 or percent >= 100
+        if finished or now - self._last_log_ts.get(job_id, float('-inf')) >= PROGRESS_LOG_INTERVAL:
+            logger.info(f"Progress {job_id}: {percent}% - {message}")
+            self._last_log_ts[job_id] = now
+        if finished:
+            self._last_log_ts.pop(job_id, None)
     
     def download_youtube_audio(self, url: str, job_id: str) -> str:
         """Download audio from YouTube with enhanced compatibility"""
@@ -410,26 +528,21 @@ class SkyMusicConverter:
                 
                 # Now download
                 ydl.download([url])
+                
+                # outtmpl + the selected format fully determine the output path
+                input_file = Path(ydl.prepare_filename(info))
             
             self.update_progress(job_id, 60, "Download completed", "Processing downloaded file")
             
-            # Find the downloaded file and convert to WAV
-            downloaded_files = []
-            for pattern in ["audio_*", f"audio_{int(time.time())-10}*"]:
-                downloaded_files.extend(list(self.temp_dir.glob(pattern)))
-            
-            if not downloaded_files:
+            if not input_file.exists():
                 raise FileNotFoundError("No audio file found after download")
             
-            input_file = max(downloaded_files, key=lambda x: x.stat().st_mtime)  # Get most recent
             wav_path = input_file.with_suffix('.wav')
             
             self.update_progress(job_id, 70, "Converting to WAV format", f"Converting {input_file.suffix} to WAV for analysis")
             
             try:
-                # Use pydub to convert to WAV
-                audio = AudioSegment.from_file(str(input_file))
-                audio.export(str(wav_path), format="wav")
+                self.convert_to_wav(input_file, wav_path)
                 
                 # Remove original file
                 if input_file != wav_path:
@@ -449,48 +562,54 @@ class SkyMusicConverter:
             logger.error(f"YouTube download failed: {e}")
             raise
     
+    def convert_to_wav(self, input_file: Path, wav_path: Path):
+        """Decode any FFmpeg-readable file straight to a mono WAV at the analysis rate"""
+        # FFmpeg writes the WAV itself, so the decoded audio never passes through Python,
+        # and analyze_audio can load it without resampling
+        result = subprocess.run(
+            [FFMPEG_BINARY, '-y', '-i', str(input_file), '-vn', '-ac', '1', '-ar', str(ANALYSIS_SR), str(wav_path)],
+            capture_output=True
+        )
+        if result.returncode != 0:
+            stderr = result.stderr.decode('utf-8', errors='replace').strip()
+            raise RuntimeError(stderr.splitlines()[-1] if stderr else f"ffmpeg exited with code {result.returncode}")
+    
     def analyze_audio(self, audio_path: str, job_id: str) -> Tuple[np.ndarray, np.ndarray, float]:
         """Advanced audio analysis with improved pitch detection"""
         try:
             self.update_progress(job_id, 75, "Loading audio file", "Reading audio data with librosa")
             
             # Load audio with librosa
-            y, sr = librosa.load(audio_path, sr=22050, mono=True)
+            y, sr = librosa.load(audio_path, sr=ANALYSIS_SR, mono=True)
             audio_duration = len(y) / sr
             
             self.update_progress(job_id, 80, "Analyzing audio properties", f"Loaded {audio_duration:.1f}s of audio at {sr}Hz sample rate")
             
-            # Enhanced pitch detection using pYIN algorithm - FIXED: removed invalid 'threshold' parameter
-            self.update_progress(job_id, 85, "Detecting pitches with AI", "Using pYIN algorithm for accurate pitch detection")
+            self.update_progress(job_id, 85, "Detecting pitches with AI", f"Using {PITCH_TRACKER} pitch tracking")
             
-            f0, voiced_flag, voiced_probs = librosa.pyin(
-                y, 
-                fmin=librosa.note_to_hz('C4'), 
-                fmax=librosa.note_to_hz('C7'),
-                sr=sr,
-                frame_length=2048,
-                hop_length=512,
-                resolution=0.1
-            )
+            f0, voiced = self.track_pitch(y, sr)
             
             self.update_progress(job_id, 88, "Filtering pitch data", "Removing unreliable pitch detections")
             
             # Remove NaN values and keep only confident pitches
-            valid_indices = ~np.isnan(f0) & (voiced_probs > 0.7)
+            valid_indices = ~np.isnan(f0) & voiced
             if not np.any(valid_indices):
                 raise ValueError("No reliable pitches detected in audio. Try with a clearer musical recording.")
                 
-            pitches = f0[valid_indices]
+            # float32 is plenty for note mapping and halves the bytes the pitch kernel reads
+            pitches = f0[valid_indices].astype(np.float32, copy=False)
+            
+            # Time alignment
+            valid_times = librosa.frames_to_time(np.flatnonzero(valid_indices), sr=sr, hop_length=HOP_LENGTH)
             
-            self.update_progress(job_id, 92, "Analyzing tempo", "Detecting beats and calculating BPM")
+            # Free the per-frame arrays before the sheet conversion allocates its notes
+            del f0, voiced, valid_indices
             
-            # Calculate tempo
-            tempo, _ = librosa.beat.beat_track(y=y, sr=sr)
+            self.update_progress(job_id, 92, "Analyzing tempo", "Estimating BPM from the tempogram")
             
-            # Time alignment
-            hop_length = 512
-            times = librosa.frames_to_time(np.arange(len(f0)), sr=sr, hop_length=hop_length)
-            valid_times = times[valid_indices]
+            # Calculate tempo (only the BPM is used, so skip beat_track's DP beat tracker)
+            onset_env = librosa.onset.onset_strength(y=y, sr=sr, hop_length=HOP_LENGTH)
+            tempo = librosa.feature.tempo(onset_envelope=onset_env, sr=sr, hop_length=HOP_LENGTH)[0]
             
             self.update_progress(job_id, 95, "Analysis complete", f"Found {len(pitches)} pitch points, tempo: {tempo:.1f} BPM")
             
@@ -502,21 +621,40 @@ class SkyMusicConverter:
             logger.error(f"Audio analysis failed: {e}")
             raise
     
-    def pitch_to_sky_note(self, frequency: float) -> str:
-        """Convert frequency to Sky Music note"""
-        if frequency <= 0 or np.isnan(frequency):
-            return None
-            
-        # Find closest Sky note
-        freq_ratios = np.array([abs(np.log2(frequency / note_freq)) 
-                               for note_freq in self.note_frequencies])
-        closest_idx = np.argmin(freq_ratios)
+    def track_pitch(self, y: np.ndarray, sr: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Estimate per-frame f0 and a voicing mask with the configured PITCH_TRACKER"""
+        fmin, fmax = FMIN_HZ, FMAX_HZ
+        
+        if PITCH_TRACKER == 'crepe':
+            try:
+                import torch
+                import torchcrepe
+                device = 'cuda' if torch.cuda.is_available() else 'cpu'
+                audio = torch.from_numpy(y).unsqueeze(0).to(device)
+                f0, periodicity = torchcrepe.predict(
+                    audio, sr, hop_length=HOP_LENGTH, fmin=fmin, fmax=fmax,
+                    model='tiny', batch_size=2048, device=device, return_periodicity=True
+                )
+                return f0[0].cpu().numpy(), periodicity[0].cpu().numpy() > 0.7
+            except ImportError:
+                logger.warning("torchcrepe not installed, falling back to YIN")
         
-        # Only accept if within reasonable range (±50 cents)
-        if freq_ratios[closest_idx] < 0.5:
-            return self.note_names[closest_idx]
+        if PITCH_TRACKER == 'pyin':
+            f0, voiced_flag, voiced_probs = librosa.pyin(
+                y,
+                fmin=fmin,
+                fmax=fmax,
+                sr=sr,
+                frame_length=FRAME_LENGTH,
+                hop_length=HOP_LENGTH,
+                resolution=0.1
+            )
+            return f0, voiced_probs > 0.7
         
-        return None
+        # YIN has no voicing decision, so gate frames on their energy instead
+        f0 = librosa.yin(y, fmin=fmin, fmax=fmax, sr=sr, frame_length=FRAME_LENGTH, hop_length=HOP_LENGTH)
+        rms = librosa.feature.rms(y=y, frame_length=FRAME_LENGTH, hop_length=HOP_LENGTH)[0][:len(f0)]
+        return f0, rms > rms.mean() * 0.3
     
     def convert_to_sky_sheet(self, pitches: np.ndarray, times: np.ndarray, 
                            tempo: float, title: str, job_id: str) -> Dict:
@@ -524,51 +662,44 @@ class SkyMusicConverter:
         try:
             self.update_progress(job_id, 96, "Converting to Sky Music format", "Mapping frequencies to Sky's 15-key system")
             
-            # Convert pitches to Sky notes
-            sky_notes = []
-            processed_count = 0
+            # Convert all pitches to Sky notes at once: distance in octaves to every note, nearest wins
+            pitches = np.asarray(pitches, dtype=np.float32)
+            times = np.asarray(times)
+            usable = np.isfinite(pitches) & (pitches > 0)
+            pitches, times = pitches[usable], times[usable]
             
-            for pitch, time in zip(pitches, times):
-                note = self.pitch_to_sky_note(pitch)
-                if note:
-                    sky_notes.append({
-                        'note': note,
-                        'time': float(time),
-                        'duration': 0.5
-                    })
-                
-                processed_count += 1
-                if processed_count % 100 == 0:
-                    progress = 96 + int((processed_count / len(pitches)) * 2)
-                    self.update_progress(job_id, progress, f"Processing notes: {processed_count}/{len(pitches)}", f"Converted {len(sky_notes)} valid notes so far")
+            # log2(p / f) == log2(p) - log2(f): one log2 per pitch against the precomputed note logs.
+            # Only accept if within reasonable range (±50 cents)
+            if _map_pitches is not None:
+                idx = _map_pitches(pitches, self._LOG_NOTE_FREQS, 0.5)
+                mask = idx >= 0
+            else:
+                log_p = np.log2(pitches)
+                log_ratios = np.abs(log_p[:, None] - self._LOG_NOTE_FREQS[None, :])
+                idx = log_ratios.argmin(axis=1)
+                mask = log_ratios[np.arange(len(pitches)), idx] < 0.5
+            note_names = self._NOTE_NAMES[idx[mask]]
+            note_times = times[mask].astype(float)
+            
+            self.update_progress(job_id, 97, f"Processing notes: {len(pitches)}/{len(pitches)}", f"Converted {len(note_names)} valid notes")
             
-            if not sky_notes:
+            if not len(note_names):
                 raise ValueError("No valid Sky notes detected. The audio may not contain recognizable musical pitches.")
             
             self.update_progress(job_id, 98, "Optimizing note sequence", "Grouping chords and removing duplicates")
             
-            # Group notes by time proximity (chord detection)
-            processed_notes = []
+            # Group notes by time proximity (chord detection): a chord is every note within
+            # 0.1 seconds of its first note, so ends[i] is where the chord starting at i stops
+            ends = np.searchsorted(note_times, note_times + 0.1, side='left').tolist()
+            note_names, note_times = note_names.tolist(), note_times.tolist()
+            
+            song_notes = []
             i = 0
-            while i < len(sky_notes):
-                current_time = sky_notes[i]['time']
-                chord_notes = [sky_notes[i]['note']]
-                
-                # Look for notes within 0.1 seconds (chord)
-                j = i + 1
-                while j < len(sky_notes) and sky_notes[j]['time'] - current_time < 0.1:
-                    chord_notes.append(sky_notes[j]['note'])
-                    j += 1
-                
-                # Remove duplicates and sort
-                chord_notes = sorted(list(set(chord_notes)))
-                
-                processed_notes.append({
-                    'time': current_time,
-                    'notes': chord_notes,
-                    'duration': 0.5
-                })
-                
+            while i < len(note_names):
+                j = ends[i]
+                # Remove duplicates and sort; chord notes share the chord's start time
+                chord_time = note_times[i]
+                song_notes.extend({"key": note, "time": chord_time} for note in sorted(set(note_names[i:j])))
                 i = j
             
             self.update_progress(job_id, 99, "Generating JSON output", "Creating Sky Music compatible format")
@@ -583,25 +714,9 @@ class SkyMusicConverter:
                 "pitchLevel": 0,
                 "isComposed": True,
                 "isEncrypted": False,
-                "songNotes": []
+                "songNotes": song_notes
             }
             
-            # Convert to Sky Music note format
-            for note_group in processed_notes:
-                if len(note_group['notes']) == 1:
-                    # Single note
-                    sky_sheet["songNotes"].append({
-                        "key": note_group['notes'][0],
-                        "time": note_group['time']
-                    })
-                else:
-                    # Chord - add as simultaneous notes
-                    for note in note_group['notes']:
-                        sky_sheet["songNotes"].append({
-                            "key": note,
-                            "time": note_group['time']
-                        })
-            
             self.update_progress(job_id, 100, "Conversion complete!", f"Generated {len(sky_sheet['songNotes'])} notes in Sky Music format")
             
             logger.info(f"Generated {len(sky_sheet['songNotes'])} notes")
@@ -616,12 +731,39 @@ class SkyMusicConverter:
         """Save Sky Music sheet to file"""
         output_path = self.output_dir / f"{filename}.json"
         
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(sheet_data, f, indent=2, ensure_ascii=False)
+        if orjson is not None:
+            # Same indented UTF-8 layout as json.dump below, serialized in C
+            with open(output_path, 'wb') as f:
+                f.write(orjson.dumps(sheet_data, option=orjson.OPT_INDENT_2))
+        else:
+            # Streamed in json.dump(indent=2)'s layout: header fields go through json,
+            # the notes are formatted straight into the file instead of through
+            # json's pure-Python indented encoder
+            with open(output_path, 'w', encoding='utf-8') as f:
+                f.write('{')
+                separator = '\n'
+                for field, value in sheet_data.items():
+                    f.write(f'{separator}  {json.dumps(field)}: ')
+                    separator = ',\n'
+                    if field == 'songNotes':
+                        self._write_song_notes(f, value)
+                    else:
+                        f.write(json.dumps(value, ensure_ascii=False))
+                f.write('\n}')
         
         logger.info(f"Sheet saved to: {output_path}")
         return str(output_path)
     
+    def _write_song_notes(self, f, song_notes: List[Dict]):
+        """Write {"key", "time"} notes as the indented songNotes JSON array"""
+        if not song_notes:
+            f.write('[]')
+            return
+        
+        # Keys are fixed Sky note names, so no escaping is needed; repr(float) is JSON's float form
+        note_format = '    {{\n      "key": "{key}",\n      "time": {time!r}\n    }}'
+        f.write('[\n' + ',\n'.join(map(note_format.format_map, song_notes)) + '\n  ]')
+    
     def cleanup_temp_files(self):
         """Clean up temporary files"""
         try:
@@ -1213,9 +1355,13 @@ HTML_TEMPLATE = """
 </html>
 """
 
+# The page has no template placeholders, so encode it once instead of running Jinja per request
+_INDEX_BYTES = HTML_TEMPLATE.encode('utf-8')
+
 @app.route('/')
 def index():
-    return render_template_string(HTML_TEMPLATE)
+    return Response(_INDEX_BYTES, mimetype='text/html',
+                    headers={'Cache-Control': 'public, max-age=3600'})
 
 @app.route('/progress/<job_id>')
 def get_progress(job_id):
@@ -1278,8 +1424,7 @@ def convert_file():
         if temp_path.suffix.lower() != '.wav':
             wav_path = temp_path.with_suffix('.wav')
             try:
-                audio = AudioSegment.from_file(str(temp_path))
-                audio.export(str(wav_path), format="wav")
+                converter.convert_to_wav(temp_path, wav_path)
                 temp_path.unlink()
                 temp_path = wav_path
             except Exception as e:
@@ -11,6 +11,7 @@ import json
 import logging
 import traceback
 import subprocess
+import importlib.util
 from pathlib import Path
 from datetime import datetime
 import tempfile
@@ -19,7 +20,11 @@ from typing import Dict, List, Optional, Tuple
 import threading
 import time
 import uuid
+import urllib.request
 import platform
+import functools
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(levelname)s:%(name)s:%(message)s')
@@ -60,31 +65,36 @@ def check_and_install_dependencies():
         'flask': '>=3.0.0',
         'flask-cors': '>=4.0.0',
         'requests': '>=2.31.0',
-        'soundfile': '>=0.12.1',
-        'pydub': '>=0.25.1'
+        'soundfile': '>=0.12.1'
+    }
+    
+    # Import names that differ from the pip distribution name
+    module_names = {
+        'yt-dlp': 'yt_dlp',
+        'flask-cors': 'flask_cors'
     }
     
     print("🔍 Checking Python dependencies...")
     missing_packages = []
     
     for package, version in dependencies.items():
-        try:
-            if package == 'yt-dlp':
-                import yt_dlp
-            elif package == 'flask-cors':
-                from flask_cors import CORS
-            elif package == 'soundfile':
-                import soundfile
-            elif package == 'pydub':
-                from pydub import AudioSegment
-            else:
-                __import__(package)
+        # find_spec only locates the module; importing librosa here would
+        # pull in numba/scipy and cost seconds before the real imports below
+        module_name = module_names.get(package, package)
+        if importlib.util.find_spec(module_name) is not None:
             print(f"✅ {package} is available")
-        except ImportError:
+        else:
             missing_packages.append(package)
             print(f"❌ {package} not found")
     
     if missing_packages:
+        # Installing at runtime is opt-in; deployments should install dependencies up front
+        if not os.environ.get('SKY_AUTO_INSTALL'):
+            specs = ' '.join(f'"{package}{dependencies[package]}"' for package in missing_packages)
+            print(f"📦 Install the missing packages with: {sys.executable} -m pip install {specs}")
+            print("   or set SKY_AUTO_INSTALL=1 to let the converter install them itself")
+            return False
+        
         print(f"📦 Installing missing packages: {', '.join(missing_packages)}")
         for package in missing_packages:
             try:
@@ -108,13 +118,83 @@ if not check_and_install_dependencies():
     sys.exit(1)
 
 # Now import the packages
+# librosa (scipy, numba, soxr) and yt_dlp take seconds to import, so they are
+# imported inside the methods that use them rather than when the web UI starts
 import numpy as np
-import librosa
-import yt_dlp
 from flask import Flask, request, jsonify, render_template_string, send_file
 from flask_cors import CORS
-import soundfile as sf
-from pydub import AudioSegment
+
+# aubio's C pitch trackers are much faster than pYIN, but it does not ship wheels
+# for every Python version, so it is optional and pYIN remains the fallback
+try:
+    import aubio
+except ImportError:
+    aubio = None
+
+# Optional C-accelerated JSON writer for large sheets; stdlib json is the fallback
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Analysis window and hop in samples, and how many frames each streamed block holds
+FRAME_LENGTH = 2048
+HOP_LENGTH = 512
+STREAM_BLOCK_FRAMES = 256
+
+# pYIN runs on segments of this many frames, each padded on both sides with this
+# many samples of real audio (a multiple of HOP_LENGTH) so decoding has context
+PYIN_SEGMENT_FRAMES = 1024
+PYIN_CONTEXT = 16 * HOP_LENGTH
+
+# Pitch search range, C4..C7 (librosa.note_to_hz('C4') / ('C7')) precomputed
+FMIN_HZ = 261.6255653005986
+FMAX_HZ = 2093.004522404789
+
+# Formats served over these protocols can be handed straight to ffmpeg, which
+# decodes the audio while it downloads instead of after yt-dlp has finished
+STREAMABLE_PROTOCOLS = {'http', 'https', 'm3u8', 'm3u8_native'}
+
+@functools.lru_cache(maxsize=None)
+def pitch_kernel():
+    """Compile the numba pitch-to-note kernel on first use, or return None without numba
+    
+    numba normally comes with librosa; it is imported here rather than at startup
+    for the same reason librosa is.
+    """
+    try:
+        from numba import njit, prange
+    except ImportError:
+        return None
+    
+    # fastmath without 'nnan'/'ninf', so the NaN check on each pitch is kept
+    @njit(cache=True, parallel=True, fastmath={'nsz', 'arcp', 'contract', 'afn', 'reassoc'})
+    def map_pitches(pitches, log_freqs, threshold):
+        """Nearest note index per pitch and whether it is within threshold octaves,
+        in one fused pass with no (pitches x notes) distance matrix"""
+        n = pitches.shape[0]
+        idx = np.zeros(n, np.int16)
+        ok = np.zeros(n, np.bool_)
+        for i in prange(n):
+            p = pitches[i]
+            if not p > 0:  # NaN or non-positive
+                continue
+            lp = np.log2(p)
+            best = 0
+            best_dist = abs(lp - log_freqs[0])
+            for k in range(1, log_freqs.shape[0]):
+                dist = abs(lp - log_freqs[k])
+                if dist < best_dist:
+                    best_dist = dist
+                    best = k
+            idx[i] = best
+            ok[i] = best_dist < threshold
+        return idx, ok
+    
+    return map_pitches
+
+# Minimum seconds between logged progress lines for the same job
+PROGRESS_LOG_INTERVAL = 0.25
 
 # Global progress tracking
 progress_data = {}
@@ -127,6 +207,9 @@ class SkyMusicConverter:
         self.output_dir = Path("output")
         self.create_directories()
         
+        # Last time a progress line was logged per job (monotonic seconds)
+        self._last_log_ts: Dict[str, float] = {}
+        
         # Sky Music note mapping (15-key layout)
         self.sky_notes = {
             'A1': {'freq': 261.63, 'row': 0, 'col': 0},  # C4
@@ -148,8 +231,10 @@ class SkyMusicConverter:
             'C5': {'freq': 1318.51, 'row': 2, 'col': 4}  # E6
         }
         
-        self.note_frequencies = [note['freq'] for note in self.sky_notes.values()]
-        self.note_names = list(self.sky_notes.keys())
+        # Names and frequencies as parallel arrays (one entry per key, in layout order) for vectorized lookups
+        self.note_names_np = np.array(list(self.sky_notes.keys()))
+        self.note_freqs_np = np.array([note['freq'] for note in self.sky_notes.values()], dtype=np.float64)
+        self._log_note_freqs = np.log2(self.note_freqs_np)
     
     def create_directories(self):
         """Create necessary directories"""
@@ -165,10 +250,23 @@ class SkyMusicConverter:
             'details': details,
             'timestamp': time.time()
         }
-        logger.info(f"Progress {job_id}: {percent}% - {message}")
+        
+        # Progress lines are debug output; when enabled, log at most one per
+        # PROGRESS_LOG_INTERVAL per job, except failures (0%) and completion
+        if not logger.isEnabledFor(logging.DEBUG):
+            return
+        now = time.monotonic()
+        finished = percent == 0 or percent >= 100
+        if finished or now - self._last_log_ts.get(job_id, float('-inf')) >= PROGRESS_LOG_INTERVAL:
+            logger.debug(f"Progress {job_id}: {percent}% - {message}")
+            self._last_log_ts[job_id] = now
+        if finished:
+            self._last_log_ts.pop(job_id, None)
     
     def download_youtube_audio(self, url: str, job_id: str) -> str:
         """Download audio from YouTube with enhanced compatibility"""
+        import yt_dlp
+        
         try:
             self.update_progress(job_id, 5, "Initializing YouTube downloader", "Setting up yt-dlp with enhanced headers")
             
@@ -207,33 +305,47 @@ class SkyMusicConverter:
                 
                 self.update_progress(job_id, 20, f"Found: {title}", f"Duration: {duration//60}:{duration%60:02d}, Starting download...")
                 
+                # Chunked downloads (YouTube sets http_chunk_size) are fetched in Range requests
+                # below; any other downloader option needs yt-dlp's own downloader
+                downloader_options = info.get('downloader_options') or {}
+                chunk_size = downloader_options.get('http_chunk_size')
+                if (info.get('url') and info.get('protocol') in STREAMABLE_PROTOCOLS
+                        and set(downloader_options) <= {'http_chunk_size'}
+                        and (not chunk_size or info['protocol'] in ('http', 'https'))):
+                    # Download and decode in one ffmpeg pass
+                    wav_path = output_path.with_suffix('.wav')
+                    http_headers = dict(info.get('http_headers') or {})
+                    cookie = ydl.cookiejar.get_cookie_header(info['url'])
+                    if cookie:
+                        http_headers['Cookie'] = cookie
+                    try:
+                        self.decode_to_wav(info['url'], wav_path, http_headers, chunk_size)
+                    except Exception as e:
+                        # Fall back to yt-dlp's own downloader with its retries
+                        logger.warning(f"Direct download failed, retrying with yt-dlp: {e}")
+                    else:
+                        self.update_progress(job_id, 70, "Download completed", "Audio was decoded to WAV while downloading")
+                        return str(wav_path)
+                
                 # Now download
                 ydl.download([url])
+                input_file = Path(ydl.prepare_filename(info))
             
             self.update_progress(job_id, 60, "Download completed", "Processing downloaded file")
             
-            # Find the downloaded file and convert to WAV
-            downloaded_files = list(self.temp_dir.glob(f"audio_{int(time.time())-5}*"))
-            if not downloaded_files:
-                # Try broader search
-                downloaded_files = list(self.temp_dir.glob("audio_*"))
-            
-            if not downloaded_files:
+            if not input_file.exists():
                 raise FileNotFoundError("No audio file found after download")
             
-            input_file = downloaded_files[-1]  # Get the most recent
-            wav_path = input_file.with_suffix('.wav')
+            wav_path = output_path.with_suffix('.wav')
             
             self.update_progress(job_id, 70, "Converting to WAV format", f"Converting {input_file.suffix} to WAV for analysis")
             
             try:
-                # Use pydub to convert to WAV
-                audio = AudioSegment.from_file(str(input_file))
-                audio.export(str(wav_path), format="wav")
+                # Decode straight to WAV with ffmpeg
+                self.decode_to_wav(str(input_file), wav_path)
                 
                 # Remove original file
-                if input_file != wav_path:
-                    input_file.unlink()
+                input_file.unlink()
                 
                 return str(wav_path)
                 
@@ -246,35 +358,120 @@ class SkyMusicConverter:
             logger.error(f"YouTube download failed: {e}")
             raise
     
+    def decode_to_wav(self, source: str, wav_path: Path, http_headers: Optional[Dict[str, str]] = None,
+                      chunk_size: Optional[int] = None):
+        """Decode source (a local file or a media URL) to mono 22.05 kHz WAV with one ffmpeg call
+        
+        URLs are decoded as the bytes arrive. With chunk_size the URL is fetched here in
+        Range requests of that size, as yt-dlp does for servers that throttle whole-file
+        requests (YouTube), and piped into ffmpeg; otherwise ffmpeg fetches it itself.
+        """
+        cmd = ['ffmpeg', '-hide_banner', '-loglevel', 'error', '-y']
+        if chunk_size:
+            cmd += ['-i', 'pipe:0']
+        else:
+            headers = ''.join(f"{name}: {value}\r\n" for name, value in (http_headers or {}).items())
+            if headers:
+                cmd += ['-headers', headers]
+            cmd += ['-i', source]
+        cmd += ['-vn', '-ac', '1', '-ar', '22050', str(wav_path)]
+        
+        if chunk_size:
+            decoder = subprocess.Popen(cmd, stdin=subprocess.PIPE, stderr=subprocess.PIPE)
+            try:
+                self._fetch_ranged(source, http_headers or {}, chunk_size, decoder.stdin)
+            except BrokenPipeError:
+                pass  # ffmpeg exited early; its error is reported below
+            except BaseException:
+                decoder.kill()
+                decoder.wait()
+                raise
+            stderr = decoder.communicate()[1].decode('utf-8', errors='replace')
+            returncode = decoder.returncode
+        else:
+            result = subprocess.run(cmd, capture_output=True, text=True)
+            stderr, returncode = result.stderr, result.returncode
+        
+        if returncode != 0:
+            raise Exception(f"Audio conversion failed. Please ensure FFmpeg is installed: {stderr.strip()[-500:]}")
+    
+    @staticmethod
+    def _fetch_ranged(url: str, http_headers: Dict[str, str], chunk_size: int, sink):
+        """Copy url into sink with sequential Range requests of chunk_size bytes"""
+        # urllib does not decompress, and media is not worth compressing anyway
+        headers = {**http_headers, 'Accept-Encoding': 'identity'}
+        start, total = 0, None
+        while total is None or start < total:
+            headers['Range'] = f"bytes={start}-{start + chunk_size - 1}"
+            request = urllib.request.Request(url, headers=headers)
+            with urllib.request.urlopen(request, timeout=30) as response:
+                if response.status != 206:
+                    # The server ignored the range and is sending the whole file
+                    shutil.copyfileobj(response, sink)
+                    return
+                size = response.headers.get('Content-Range', '*').rpartition('/')[2]
+                total = int(size) if size.isdigit() else None
+                received = 0
+                for block in iter(functools.partial(response.read, 1 << 16), b''):
+                    sink.write(block)
+                    received += len(block)
+            start += received
+            if not received or (total is None and received < chunk_size):
+                return  # Unknown length: a short chunk is the last one
+    
     def analyze_audio(self, audio_path: str, job_id: str) -> Tuple[np.ndarray, np.ndarray, float]:
         """Advanced audio analysis with improved pitch detection"""
+        import librosa
+        
         try:
-            self.update_progress(job_id, 75, "Loading audio file", "Reading audio data with librosa")
+            self.update_progress(job_id, 75, "Loading audio file", "Streaming audio data with librosa")
             
-            # Load audio with librosa
-            y, sr = librosa.load(audio_path, sr=22050, mono=True)
-            audio_duration = len(y) / sr
+            # Stream the file in frame-aligned blocks instead of loading it whole,
+            # so memory stays at a few blocks however long the song is. librosa.stream
+            # cannot resample, so callers pass decode_to_wav's 22.05 kHz output.
+            sr = librosa.get_samplerate(audio_path)
+            audio_duration = librosa.get_duration(path=audio_path)
+            blocks = librosa.stream(
+                audio_path,
+                block_length=STREAM_BLOCK_FRAMES,
+                frame_length=FRAME_LENGTH,
+                hop_length=HOP_LENGTH,
+                mono=True
+            )
             
-            self.update_progress(job_id, 80, "Analyzing audio properties", f"Loaded {audio_duration:.1f}s of audio at {sr}Hz sample rate")
+            self.update_progress(job_id, 80, "Analyzing audio properties", f"Streaming {audio_duration:.1f}s of audio at {sr}Hz sample rate")
             
-            # Enhanced pitch detection using pYIN algorithm
-            self.update_progress(job_id, 85, "Detecting pitches with AI", "Using pYIN algorithm for accurate pitch detection")
+            # Tempo is estimated from an onset envelope gathered as the blocks go by
+            onset_parts = []
+            blocks = self._collect_onsets(blocks, sr, onset_parts)
             
-            f0, voiced_flag, voiced_probs = librosa.pyin(
-                y, 
-                fmin=librosa.note_to_hz('C4'), 
-                fmax=librosa.note_to_hz('C7'),
-                sr=sr,
-                frame_length=2048,
-                hop_length=512,
-                threshold=0.1,
-                resolution=0.1
-            )
-            
-            self.update_progress(job_id, 88, "Filtering pitch data", "Removing unreliable pitch detections")
+            if aubio is not None:
+                # Fast path: aubio's yinfast tracker
+                self.update_progress(job_id, 85, "Detecting pitches with AI", "Using aubio's fast YIN pitch tracker")
+                
+                f0, confidence = self.track_pitch_aubio(blocks, sr)
+                
+                self.update_progress(job_id, 88, "Filtering pitch data", "Removing unreliable pitch detections")
+                
+                # Keep confident pitches inside the range pYIN would search
+                valid_indices = (confidence > 0.7) & (f0 >= FMIN_HZ) & (f0 <= FMAX_HZ)
+                
+                # aubio reports each hop for the window ending at that hop
+                sample_positions = np.maximum(0, (np.arange(len(f0)) + 1) * HOP_LENGTH - FRAME_LENGTH // 2)
+            else:
+                # Enhanced pitch detection using pYIN algorithm
+                self.update_progress(job_id, 85, "Detecting pitches with AI", "Using pYIN algorithm for accurate pitch detection")
+                
+                f0, voiced_probs = self.track_pitch_pyin(blocks, sr, FMIN_HZ, FMAX_HZ)
+                
+                self.update_progress(job_id, 88, "Filtering pitch data", "Removing unreliable pitch detections")
+                
+                # Remove NaN values and keep only confident pitches
+                valid_indices = ~np.isnan(f0) & (voiced_probs > 0.7)
+                
+                # pYIN frames are centred on each hop
+                sample_positions = np.arange(len(f0)) * HOP_LENGTH
             
-            # Remove NaN values and keep only confident pitches
-            valid_indices = ~np.isnan(f0) & (voiced_probs > 0.7)
             if not np.any(valid_indices):
                 raise ValueError("No reliable pitches detected in audio. Try with a clearer musical recording.")
                 
@@ -283,12 +480,12 @@ class SkyMusicConverter:
             self.update_progress(job_id, 92, "Analyzing tempo", "Detecting beats and calculating BPM")
             
             # Calculate tempo
-            tempo, _ = librosa.beat.beat_track(y=y, sr=sr)
+            onset_env = np.concatenate(onset_parts)
+            tempo, _ = librosa.beat.beat_track(onset_envelope=onset_env, sr=sr, hop_length=HOP_LENGTH)
+            tempo = float(np.atleast_1d(tempo)[0])  # librosa 0.11 returns a 1-element array
             
-            # Time alignment
-            hop_length = 512
-            times = librosa.frames_to_time(np.arange(len(f0)), sr=sr, hop_length=hop_length)
-            valid_times = times[valid_indices]
+            # Time alignment: centre of each analysis window, in seconds
+            valid_times = sample_positions[valid_indices] / sr
             
             self.update_progress(job_id, 95, "Analysis complete", f"Found {len(pitches)} pitch points, tempo: {tempo:.1f} BPM")
             
@@ -300,21 +497,150 @@ class SkyMusicConverter:
             logger.error(f"Audio analysis failed: {e}")
             raise
     
-    def pitch_to_sky_note(self, frequency: float) -> str:
-        """Convert frequency to Sky Music note"""
-        if frequency <= 0 or np.isnan(frequency):
-            return None
+    def _collect_onsets(self, blocks, sr: int, onset_parts: List[np.ndarray]):
+        """Pass blocks through unchanged, appending each block's onset strength to onset_parts
+        
+        The last spectrogram frame of every block is carried into the next one, so the
+        envelope matches a single uncentered onset_strength call over the whole signal.
+        """
+        import librosa
+        
+        previous = None
+        for block in blocks:
+            if len(block) < FRAME_LENGTH:
+                # Short tail with no whole frame left; nothing to add to the envelope
+                yield block
+                continue
+            S = librosa.power_to_db(librosa.feature.melspectrogram(
+                y=block, sr=sr, n_fft=FRAME_LENGTH, hop_length=HOP_LENGTH, center=False
+            ))
+            if previous is None:
+                onset_parts.append(librosa.onset.onset_strength(S=S, sr=sr, center=False))
+            else:
+                onset_parts.append(librosa.onset.onset_strength(S=np.hstack([previous, S]), sr=sr, center=False)[1:])
+            previous = S[:, -1:]
+            yield block
+    
+    def _new_samples(self, blocks):
+        """Yield the audio of a librosa.stream block stream with every sample exactly once
+        
+        Consecutive blocks share FRAME_LENGTH - HOP_LENGTH samples.
+        """
+        for i, block in enumerate(blocks):
+            yield block if i == 0 else block[FRAME_LENGTH - HOP_LENGTH:]
+    
+    def track_pitch_pyin(self, blocks, sr: int, fmin: float, fmax: float) -> Tuple[np.ndarray, np.ndarray]:
+        """Run librosa.pyin over a stream of blocks, spread across CPU cores
+        
+        The audio is cut into PYIN_SEGMENT_FRAMES-frame segments. Each one is analyzed with
+        PYIN_CONTEXT samples of the real signal on both sides and only its own frames are
+        kept, so frames line up with a single pyin call over the whole signal; only the
+        decoding right at the seams can differ. At most one segment per core plus one is
+        held in memory. Returns f0 and voiced_probs.
+        """
+        import librosa
+        
+        workers = os.cpu_count() or 1
+        f0_parts, prob_parts = [], []
+        pending = deque()
+        
+        buffer = np.empty(0, dtype=np.float32)
+        buffer_start = 0  # position of buffer[0] in the whole signal
+        next_frame = 0    # first frame not yet handed to a worker
+        
+        def collect(job, skip, count):
+            f0, _, voiced_probs = job.result()
+            f0_parts.append(f0[skip:skip + count])
+            prob_parts.append(voiced_probs[skip:skip + count])
+        
+        def submit(pool, last_frame, end):
+            # Frames next_frame..last_frame from the audio up to sample `end`
+            nonlocal buffer, buffer_start, next_frame
+            start = max(0, next_frame * HOP_LENGTH - PYIN_CONTEXT)
+            job = pool.submit(
+                librosa.pyin,
+                buffer[start - buffer_start:end - buffer_start],
+                fmin=fmin,
+                fmax=fmax,
+                sr=sr,
+                frame_length=FRAME_LENGTH,
+                hop_length=HOP_LENGTH,
+                resolution=0.1
+            )
+            pending.append((job, next_frame - start // HOP_LENGTH, last_frame - next_frame))
+            next_frame = last_frame
             
-        # Find closest Sky note
-        freq_ratios = np.array([abs(np.log2(frequency / note_freq)) 
-                               for note_freq in self.note_frequencies])
-        closest_idx = np.argmin(freq_ratios)
+            # Drop audio that no later segment reaches back to
+            keep_from = max(0, next_frame * HOP_LENGTH - PYIN_CONTEXT)
+            buffer = buffer[keep_from - buffer_start:]
+            buffer_start = keep_from
+            
+            if len(pending) > workers:
+                collect(*pending.popleft())
         
-        # Only accept if within reasonable range (±50 cents)
-        if freq_ratios[closest_idx] < 0.5:
-            return self.note_names[closest_idx]
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for samples in self._new_samples(blocks):
+                buffer = np.concatenate([buffer, samples])
+                
+                # A segment can go once the context after it has arrived as well
+                while (next_frame + PYIN_SEGMENT_FRAMES) * HOP_LENGTH + PYIN_CONTEXT <= buffer_start + len(buffer):
+                    last_frame = next_frame + PYIN_SEGMENT_FRAMES
+                    submit(pool, last_frame, last_frame * HOP_LENGTH + PYIN_CONTEXT)
+            
+            # The rest; a centred pyin call over n samples gives 1 + n // HOP_LENGTH frames
+            total = buffer_start + len(buffer)
+            n_frames = 1 + total // HOP_LENGTH
+            if next_frame < n_frames:
+                submit(pool, n_frames, total)
+            
+            while pending:
+                collect(*pending.popleft())
         
-        return None
+        return np.concatenate(f0_parts), np.concatenate(prob_parts)
+    
+    def track_pitch_aubio(self, blocks, sr: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Run aubio's yinfast tracker over a stream of blocks in HOP_LENGTH-sample hops
+        
+        Returns per-hop frequencies in Hz and aubio's confidence for each of them.
+        """
+        pitch_o = aubio.pitch("yinfast", FRAME_LENGTH, HOP_LENGTH, sr)
+        pitch_o.set_unit("Hz")
+        
+        f0, confidence = [], []
+        carry = np.empty(0, dtype=np.float32)
+        
+        # aubio keeps its own history, so it is fed each sample once
+        for new in self._new_samples(blocks):
+            samples = np.concatenate([carry, new.astype(np.float32)])
+            n_hops = len(samples) // HOP_LENGTH
+            
+            for frame in samples[:n_hops * HOP_LENGTH].reshape(n_hops, HOP_LENGTH):
+                f0.append(pitch_o(frame)[0])
+                confidence.append(pitch_o.get_confidence())
+            carry = samples[n_hops * HOP_LENGTH:]
+        
+        return np.asarray(f0, dtype=np.float32), np.asarray(confidence, dtype=np.float32)
+    
+    def _map_pitches_vectorized(self, pitches: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Map every frequency to its closest Sky note index in one pass
+        
+        Returns (idx, ok): the nearest note index per pitch, and whether that note
+        is within reasonable range (±50 cents). Non-positive or NaN pitches are never ok.
+        """
+        p = np.asarray(pitches, dtype=np.float64)
+        
+        kernel = pitch_kernel()
+        if kernel is not None:
+            return kernel(p, self._log_note_freqs, 0.5)
+        
+        p = np.where(p > 0, p, np.nan)
+        
+        # Distance in octaves to every note; NaN rows fail the range check below
+        lp = np.log2(p)
+        d = np.abs(lp[:, None] - self._log_note_freqs[None, :])
+        idx = np.argmin(d, axis=1)
+        ok = d[np.arange(len(p)), idx] < 0.5
+        return idx, ok
     
     def convert_to_sky_sheet(self, pitches: np.ndarray, times: np.ndarray, 
                            tempo: float, title: str, job_id: str) -> Dict:
@@ -323,49 +649,36 @@ class SkyMusicConverter:
             self.update_progress(job_id, 96, "Converting to Sky Music format", "Mapping frequencies to Sky's 15-key system")
             
             # Convert pitches to Sky notes
-            sky_notes = []
-            processed_count = 0
+            idx, ok = self._map_pitches_vectorized(pitches)
+            ok_idx = np.nonzero(ok)[0]
+            note_idx = idx[ok_idx]
+            times_arr = np.asarray(times, dtype=np.float64)[ok_idx]
             
-            for pitch, time in zip(pitches, times):
-                note = self.pitch_to_sky_note(pitch)
-                if note:
-                    sky_notes.append({
-                        'note': note,
-                        'time': float(time),
-                        'duration': 0.5
-                    })
-                
-                processed_count += 1
-                if processed_count % 100 == 0:
-                    progress = 96 + int((processed_count / len(pitches)) * 2)
-                    self.update_progress(job_id, progress, f"Processing notes: {processed_count}/{len(pitches)}", f"Converted {len(sky_notes)} valid notes so far")
+            self.update_progress(job_id, 97, f"Processing notes: {len(pitches)}/{len(pitches)}", f"Converted {len(note_idx)} valid notes")
             
-            if not sky_notes:
+            if not len(note_idx):
                 raise ValueError("No valid Sky notes detected. The audio may not contain recognizable musical pitches.")
             
             self.update_progress(job_id, 98, "Optimizing note sequence", "Grouping chords and removing duplicates")
             
-            # Group notes by time proximity (chord detection)
-            processed_notes = []
+            # Group notes by time proximity (chord detection): a chord is every note within
+            # 0.1 seconds of its first note, so ends[i] is where the chord starting at i stops
+            ends = np.searchsorted(times_arr, times_arr + 0.1, side='left').tolist()
+            
+            # Plain Python values from here on: one bulk conversion instead of a box per element
+            note_idx, note_times = note_idx.tolist(), times_arr.tolist()
+            names = self.note_names_np.tolist()
+            
+            # Only the final songNotes entries are built as dicts. Note indices follow the
+            # table's A1..C5 order, so sorting indices sorts the chord by note name.
+            song_notes = []
             i = 0
-            while i < len(sky_notes):
-                current_time = sky_notes[i]['time']
-                chord_notes = [sky_notes[i]['note']]
-                
-                # Look for notes within 0.1 seconds (chord)
-                j = i + 1
-                while j < len(sky_notes) and sky_notes[j]['time'] - current_time < 0.1:
-                    chord_notes.append(sky_notes[j]['note'])
-                    j += 1
+            while i < len(note_idx):
+                j = ends[i]
                 
-                # Remove duplicates and sort
-                chord_notes = sorted(list(set(chord_notes)))
-                
-                processed_notes.append({
-                    'time': current_time,
-                    'notes': chord_notes,
-                    'duration': 0.5
-                })
+                # Remove duplicates and sort; chord notes share the chord's start time
+                time = note_times[i]
+                song_notes.extend({"key": names[k], "time": time} for k in sorted(set(note_idx[i:j])))
                 
                 i = j
             
@@ -381,25 +694,9 @@ class SkyMusicConverter:
                 "pitchLevel": 0,
                 "isComposed": True,
                 "isEncrypted": False,
-                "songNotes": []
+                "songNotes": song_notes
             }
             
-            # Convert to Sky Music note format
-            for note_group in processed_notes:
-                if len(note_group['notes']) == 1:
-                    # Single note
-                    sky_sheet["songNotes"].append({
-                        "key": note_group['notes'][0],
-                        "time": note_group['time']
-                    })
-                else:
-                    # Chord - add as simultaneous notes
-                    for note in note_group['notes']:
-                        sky_sheet["songNotes"].append({
-                            "key": note,
-                            "time": note_group['time']
-                        })
-            
             self.update_progress(job_id, 100, "Conversion complete!", f"Generated {len(sky_sheet['songNotes'])} notes in Sky Music format")
             
             logger.info(f"Generated {len(sky_sheet['songNotes'])} notes")
@@ -414,8 +711,13 @@ class SkyMusicConverter:
         """Save Sky Music sheet to file"""
         output_path = self.output_dir / f"{filename}.json"
         
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(sheet_data, f, indent=2, ensure_ascii=False)
+        if orjson is not None:
+            # Same indented UTF-8 layout as json.dump below, serialized in C
+            with open(output_path, 'wb') as f:
+                f.write(orjson.dumps(sheet_data, option=orjson.OPT_INDENT_2))
+        else:
+            with open(output_path, 'w', encoding='utf-8') as f:
+                json.dump(sheet_data, f, indent=2, ensure_ascii=False)
         
         logger.info(f"Sheet saved to: {output_path}")
         return str(output_path)
@@ -423,12 +725,14 @@ class SkyMusicConverter:
     def cleanup_temp_files(self):
         """Clean up temporary files"""
         try:
-            for file_path in self.temp_dir.glob("*"):
-                if file_path.is_file():
-                    try:
-                        file_path.unlink()
-                    except Exception:
-                        pass  # Ignore files in use
+            # scandir's cached entry type saves a stat per file over Path.glob + is_file
+            with os.scandir(self.temp_dir) as entries:
+                for entry in entries:
+                    if entry.is_file(follow_symlinks=False):
+                        try:
+                            os.unlink(entry.path)
+                        except OSError:
+                            pass  # Ignore files in use
             logger.info("🧹 Temporary files cleaned up")
         except Exception as e:
             logger.warning(f"Cleanup warning: {e}")
@@ -1111,18 +1415,14 @@ def convert_file():
         temp_path = converter.temp_dir / f"upload_{int(time.time())}.{audio_file.filename.split('.')[-1]}"
         audio_file.save(str(temp_path))
         
-        converter.update_progress(job_id, 10, "File uploaded", "Converting to WAV format if needed")
+        converter.update_progress(job_id, 10, "File uploaded", "Converting to 22.05 kHz mono WAV")
         
-        # Convert to WAV if needed
-        if temp_path.suffix.lower() != '.wav':
-            wav_path = temp_path.with_suffix('.wav')
-            try:
-                audio = AudioSegment.from_file(str(temp_path))
-                audio.export(str(wav_path), format="wav")
-                temp_path.unlink()
-                temp_path = wav_path
-            except Exception as e:
-                raise Exception(f"Audio conversion failed. Please ensure FFmpeg is installed: {str(e)}")
+        # WAV uploads are decoded too: analyze_audio streams the file at its own rate,
+        # so every upload is brought to the 22.05 kHz the analysis is tuned for
+        wav_path = temp_path.with_suffix('.decoded.wav')
+        converter.decode_to_wav(str(temp_path), wav_path)
+        temp_path.unlink()
+        temp_path = wav_path
         
         # Analyze audio
         pitches, times, tempo = converter.analyze_audio(str(temp_path), job_id)
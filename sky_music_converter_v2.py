@@ -6,6 +6,7 @@ Updated for Python 3.12+ compatibility with modern UI and real-time processing u
 """
 
 import os
+import re
 import sys
 import json
 import logging
@@ -15,10 +16,15 @@ from pathlib import Path
 from datetime import datetime
 import tempfile
 import shutil
-from typing import Dict, List, Optional, Tuple
+from typing import BinaryIO, Dict, List, Optional, Tuple, Union
 import threading
 import time
 import uuid
+import hashlib
+import itertools
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import gzip
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(levelname)s:%(name)s:%(message)s')
@@ -35,9 +41,10 @@ def check_and_install_dependencies():
         'flask-cors': '>=4.0.0',
         'requests': '>=2.31.0',
         'soundfile': '>=0.12.1',
-        'pydub': '>=0.25.1',
         'matplotlib': '>=3.8.0',
-        'Pillow': '>=10.0.0'
+        'Pillow': '>=10.0.0',
+        'waitress': '>=3.0.0',
+        'flask-compress': '>=1.14'
     }
     
     print("🔍 Checking dependencies...")
@@ -51,8 +58,8 @@ def check_and_install_dependencies():
                 from flask_cors import CORS
             elif package == 'soundfile':
                 import soundfile
-            elif package == 'pydub':
-                from pydub import AudioSegment
+            elif package == 'flask-compress':
+                from flask_compress import Compress
             else:
                 __import__(package)
             print(f"✅ {package} is available")
@@ -83,13 +90,49 @@ if not check_and_install_dependencies():
 import numpy as np
 import librosa
 import yt_dlp
-from flask import Flask, request, jsonify, render_template_string, send_file
+from flask import Flask, Response, request, jsonify, send_from_directory
+from werkzeug.exceptions import NotFound
 from flask_cors import CORS
+from flask_compress import Compress
+from waitress import serve
 import soundfile as sf
-from pydub import AudioSegment
 
-# Global progress tracking
-progress_data = {}
+# Optional: brotli compresses the page assets better than gzip when the browser accepts it
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Global progress tracking; progress_condition guards progress_data and job_results and is
+# notified on every update so progress streams can push changes instead of being polled.
+# Both maps are bounded: least recently updated jobs drop out past MAX_TRACKED_JOBS, and
+# finished jobs are forgotten FINISHED_JOB_TTL seconds after their result is published.
+# Each progress_data record is {'state': {...}, 'json': <state serialized once>, 'version': n}.
+progress_data: "OrderedDict[str, Dict]" = OrderedDict()
+progress_condition = threading.Condition()
+progress_versions = itertools.count(1)
+MAX_TRACKED_JOBS = 1024
+FINISHED_JOB_TTL = 60
+
+# Seconds between keep-alive comments on an idle progress stream
+PROGRESS_KEEPALIVE = 15
+# Outcome sent to a progress stream whose job is still unknown after one keep-alive interval
+UNKNOWN_JOB_RESULT = {'success': False, 'error': 'Unknown or expired job'}
+
+# Final outcome of each job ({'success': ..., ...}), published under progress_condition
+job_results: "OrderedDict[str, Dict]" = OrderedDict()
+
+def forget_job(job_id: str):
+    """Drop a finished job's progress and result"""
+    with progress_condition:
+        progress_data.pop(job_id, None)
+        job_results.pop(job_id, None)
+
+# Conversions run here instead of on the request thread. Threads rather than processes:
+# progress and results live in this process for the progress streams, and the heavy
+# librosa/NumPy work releases the GIL.
+JOB_WORKERS = min(4, os.cpu_count() or 1)
+job_executor = ThreadPoolExecutor(max_workers=JOB_WORKERS, thread_name_prefix="sky-job")
 
 class SkyMusicConverter:
     """Sky Music Converter with modern algorithms and compatibility"""
@@ -131,12 +174,20 @@ class SkyMusicConverter:
     
     def update_progress(self, job_id: str, percent: int, message: str, details: str = ""):
         """Update progress for a specific job"""
-        progress_data[job_id] = {
+        state = {
             'percent': percent,
             'message': message,
             'details': details,
             'timestamp': time.time()
         }
+        # Serialized once here; every progress stream for the job sends these same bytes
+        state_json = json.dumps(state)
+        with progress_condition:
+            progress_data[job_id] = {'state': state, 'json': state_json, 'version': next(progress_versions)}
+            progress_data.move_to_end(job_id)
+            while len(progress_data) > MAX_TRACKED_JOBS:
+                progress_data.popitem(last=False)
+            progress_condition.notify_all()
         logger.info(f"Progress {job_id}: {percent}% - {message}")
     
     def download_youtube_audio(self, url: str, job_id: str) -> str:
@@ -144,7 +195,8 @@ class SkyMusicConverter:
         try:
             self.update_progress(job_id, 5, "Initializing YouTube downloader", "Setting up yt-dlp with enhanced headers")
             
-            output_path = self.temp_dir / f"audio_{int(time.time())}.wav"
+            job_dir = self.job_temp_dir(job_id)
+            output_path = job_dir / "audio.wav"
             
             # Enhanced yt-dlp options for better compatibility
             ydl_opts = {
@@ -184,19 +236,11 @@ class SkyMusicConverter:
                 # Now download
                 ydl.download([url])
             
-            self.update_progress(job_id, 60, "Download completed", "Processing downloaded file and converting to WAV")
+            self.update_progress(job_id, 60, "Download completed", "Processing downloaded file")
             
-            # Find the downloaded file
-            for file_path in self.temp_dir.glob("audio_*.*"):
+            # Find the downloaded file; librosa decodes it directly, no WAV copy needed
+            for file_path in job_dir.glob("audio.*"):
                 if file_path.suffix in ['.wav', '.mp3', '.m4a', '.webm', '.opus']:
-                    # Convert to WAV if needed
-                    if file_path.suffix != '.wav':
-                        self.update_progress(job_id, 70, "Converting to WAV format", f"Converting {file_path.suffix} to WAV for analysis")
-                        wav_path = file_path.with_suffix('.wav')
-                        audio = AudioSegment.from_file(str(file_path))
-                        audio.export(str(wav_path), format="wav")
-                        file_path.unlink()  # Remove original
-                        return str(wav_path)
                     return str(file_path)
                     
             raise FileNotFoundError("No audio file found after download")
@@ -206,13 +250,15 @@ class SkyMusicConverter:
             logger.error(f"YouTube download failed: {e}")
             raise
     
-    def analyze_audio(self, audio_path: str, job_id: str) -> Tuple[np.ndarray, np.ndarray, float]:
+    def analyze_audio(self, audio_source: Union[str, BinaryIO], job_id: str) -> Tuple[np.ndarray, np.ndarray, float]:
         """Advanced audio analysis with improved pitch detection and real progress"""
         try:
             self.update_progress(job_id, 75, "Loading audio file", "Reading audio data with librosa")
             
-            # Load audio with librosa
-            y, sr = librosa.load(audio_path, sr=22050, mono=True)
+            # Load audio with librosa: soundfile reads WAV/FLAC/OGG natively and
+            # audioread decodes MP3/M4A/WebM through FFmpeg, so no WAV copy is needed.
+            # Spooled uploads arrive as an open file object positioned at the start.
+            y, sr = librosa.load(audio_source, sr=22050, mono=True)
             audio_duration = len(y) / sr
             
             self.update_progress(job_id, 80, "Analyzing audio properties", f"Loaded {audio_duration:.1f}s of audio at {sr}Hz sample rate")
@@ -380,21 +426,474 @@ class SkyMusicConverter:
         logger.info(f"Sheet saved to: {output_path}")
         return str(output_path)
     
+    def job_temp_dir(self, job_id: str) -> Path:
+        """Private scratch directory for one job, so concurrent jobs never touch each other's files"""
+        job_dir = self.temp_dir / job_id
+        job_dir.mkdir(exist_ok=True)
+        return job_dir
+    
+    def cleanup_job_files(self, job_id: str):
+        """Remove a job's scratch directory"""
+        shutil.rmtree(self.temp_dir / job_id, ignore_errors=True)
+    
     def cleanup_temp_files(self):
         """Clean up temporary files"""
         try:
             for file_path in self.temp_dir.glob("*"):
-                file_path.unlink()
+                if file_path.is_dir():
+                    shutil.rmtree(file_path, ignore_errors=True)
+                else:
+                    file_path.unlink()
             logger.info("🧹 Temporary files cleaned up")
         except Exception as e:
             logger.warning(f"Cleanup failed: {e}")
 
+# Uploads are copied to disk in chunks of this size
+UPLOAD_CHUNK_SIZE = 8 * 1024 * 1024
+# Largest accepted request body; Flask answers 413 above this
+MAX_UPLOAD_SIZE = 200 * 1024 * 1024
+# Uploads in a format soundfile decodes stay in memory up to this size and only
+# roll over to a file in the job directory beyond it
+SPOOL_MAX_SIZE = 16 * 1024 * 1024
+SPOOLED_FORMATS = {'wav', 'flac', 'ogg'}
+
+# Accepted YouTube links: watch?v=, youtu.be/ and shorts/ URLs with an 11-character video id
+YT_RE = re.compile(r'^https?://(www\.|m\.)?(youtube\.com/(watch\?v=|shorts/)|youtu\.be/)[\w-]{11}')
+
+# Characters dropped from sheet file names: anything but alphanumerics, space, '-' and '_'
+# (\w is exactly str.isalnum() plus '_')
+UNSAFE_FILENAME_RE = re.compile(r'[^\w \-]')
+
+def safe_filename(title: str) -> str:
+    """File-system safe sheet name derived from the song title"""
+    return UNSAFE_FILENAME_RE.sub('', title).strip()
+
+# Job ids are '<yt|file>_' + a UUID; anything else is refused before touching progress_data
+JOB_ID_RE = re.compile(r'^(yt|file)_[0-9a-f-]{36}$')
+
+def copy_upload(upload, f: BinaryIO) -> str:
+    """Copy an uploaded file into f in fixed-size chunks so memory use stays flat.
+    
+    Returns a short content id (first 16 hex chars of the SHA-256) computed on the way through.
+    """
+    digest = hashlib.sha256()
+    while chunk := upload.stream.read(UPLOAD_CHUNK_SIZE):
+        digest.update(chunk)
+        f.write(chunk)
+    return digest.hexdigest()[:16]
+
+def receive_upload(upload, job_dir: Path) -> Tuple[Union[Path, BinaryIO], str]:
+    """Take in an upload, returning the audio source for analyze_audio and its content id.
+    
+    WAV/FLAC/OGG go into a SpooledTemporaryFile that soundfile reads directly, so small
+    uploads never touch the disk. Other formats are decoded by audioread, which needs a
+    real path, so they are written to the job directory.
+    """
+    ext = upload.filename.rsplit('.', 1)[-1].lower()
+    if ext in SPOOLED_FORMATS:
+        buf = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE, dir=job_dir)
+        try:
+            file_id = copy_upload(upload, buf)
+        except Exception:
+            buf.close()
+            raise
+        buf.seek(0)
+        return buf, file_id
+    
+    path = job_dir / f"upload.{ext}"
+    with open(path, 'wb') as f:
+        file_id = copy_upload(upload, f)
+    return path, file_id
+
+# Finished uploads: (file_id, title) -> (output_path, notes_count), so re-uploading the
+# same audio under the same title skips analysis entirely
+upload_cache: Dict[Tuple[str, str], Tuple[str, int]] = {}
+upload_cache_lock = threading.Lock()
+
+def forget_sheet(output_path: str):
+    """Drop cache entries pointing at a sheet that has just been overwritten"""
+    with upload_cache_lock:
+        for key in [key for key, (path, _) in upload_cache.items() if path == output_path]:
+            del upload_cache[key]
+
+def remember_upload(file_id: str, title: str, output_path: str, notes_count: int):
+    """Record a finished upload as the current owner of its sheet"""
+    forget_sheet(output_path)
+    with upload_cache_lock:
+        upload_cache[(file_id, title)] = (output_path, notes_count)
+
+def lookup_upload(file_id: str, title: str) -> Optional[Tuple[str, int]]:
+    """Return (output_path, notes_count) for an already converted upload whose sheet still exists"""
+    with upload_cache_lock:
+        cached = upload_cache.get((file_id, title))
+    if cached and Path(cached[0]).exists():
+        return cached
+    return None
+
 # Flask Web Application
 app = Flask(__name__)
+app.config['MAX_CONTENT_LENGTH'] = MAX_UPLOAD_SIZE
+# Behind nginx/Apache with X-Sendfile support, let the proxy stream downloads itself
+app.config['USE_X_SENDFILE'] = os.environ.get('SKY_USE_X_SENDFILE') == '1'
 CORS(app)
 
+# Compress dynamic responses (JSON). The page assets are already pre-compressed and keep their
+# Content-Encoding, downloads are file passthroughs, and streamed responses are left alone so
+# progress events are not held back in a compressor buffer.
+app.config['COMPRESS_ALGORITHM'] = ['br', 'gzip']
+app.config['COMPRESS_MIN_SIZE'] = 512
+app.config['COMPRESS_STREAMS'] = False
+Compress(app)
+
+# Production WSGI server settings. Each open progress stream holds a server thread until its
+# job finishes, so keep well more threads than job workers.
+SERVER_THREADS = 16
+
 converter = SkyMusicConverter()
 
+# Page stylesheet, served separately from the HTML as /static/app.css
+APP_CSS = '''
+* {
+    margin: 0;
+    padding: 0;
+    box-sizing: border-box;
+}
+
+body {
+    font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, Oxygen, Ubuntu, Cantarell, sans-serif;
+    background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+    min-height: 100vh;
+    color: white;
+    overflow-x: hidden;
+}
+
+.container {
+    max-width: 1200px;
+    margin: 0 auto;
+    padding: 20px;
+    position: relative;
+    z-index: 2;
+}
+
+.header {
+    text-align: center;
+    margin-bottom: 3rem;
+    animation: fadeInDown 1s ease-out;
+}
+
+.header h1 {
+    font-size: 3rem;
+    font-weight: 700;
+    margin-bottom: 1rem;
+    background: linear-gradient(45deg, #fff, #f0f8ff);
+    -webkit-background-clip: text;
+    -webkit-text-fill-color: transparent;
+    background-clip: text;
+}
+
+.header p {
+    font-size: 1.2rem;
+    opacity: 0.9;
+    max-width: 600px;
+    margin: 0 auto;
+}
+
+.converter-grid {
+    display: grid;
+    grid-template-columns: repeat(auto-fit, minmax(400px, 1fr));
+    gap: 2rem;
+    margin-bottom: 3rem;
+}
+
+.converter-card {
+    background: rgba(255, 255, 255, 0.1);
+    backdrop-filter: blur(10px);
+    border: 1px solid rgba(255, 255, 255, 0.2);
+    border-radius: 20px;
+    padding: 2rem;
+    transition: all 0.3s ease;
+    animation: fadeInUp 1s ease-out;
+}
+
+.converter-card:hover {
+    transform: translateY(-5px);
+    background: rgba(255, 255, 255, 0.15);
+    box-shadow: 0 20px 40px rgba(0, 0, 0, 0.2);
+}
+
+.card-icon {
+    font-size: 3rem;
+    margin-bottom: 1rem;
+    text-align: center;
+}
+
+.card-title {
+    font-size: 1.5rem;
+    font-weight: 600;
+    margin-bottom: 1rem;
+    text-align: center;
+}
+
+.input-group {
+    margin-bottom: 1.5rem;
+}
+
+.input-group label {
+    display: block;
+    margin-bottom: 0.5rem;
+    font-weight: 500;
+}
+
+.input-field {
+    width: 100%;
+    padding: 1rem;
+    border: 2px solid rgba(255, 255, 255, 0.3);
+    border-radius: 10px;
+    background: rgba(255, 255, 255, 0.1);
+    color: white;
+    font-size: 1rem;
+    transition: all 0.3s ease;
+}
+
+.input-field::placeholder {
+    color: rgba(255, 255, 255, 0.7);
+}
+
+.input-field:focus {
+    outline: none;
+    border-color: rgba(255, 255, 255, 0.8);
+    background: rgba(255, 255, 255, 0.2);
+}
+
+.file-input-wrapper {
+    position: relative;
+    display: inline-block;
+    cursor: pointer;
+    width: 100%;
+}
+
+.file-input {
+    position: absolute;
+    opacity: 0;
+    width: 100%;
+    height: 100%;
+    cursor: pointer;
+}
+
+.file-input-display {
+    display: flex;
+    align-items: center;
+    justify-content: center;
+    min-height: 120px;
+    border: 2px dashed rgba(255, 255, 255, 0.5);
+    border-radius: 10px;
+    background: rgba(255, 255, 255, 0.05);
+    transition: all 0.3s ease;
+    text-align: center;
+}
+
+.file-input-wrapper:hover .file-input-display {
+    border-color: rgba(255, 255, 255, 0.8);
+    background: rgba(255, 255, 255, 0.1);
+}
+
+.convert-btn {
+    width: 100%;
+    padding: 1rem 2rem;
+    background: linear-gradient(45deg, #ff6b6b, #ff8e53);
+    color: white;
+    border: none;
+    border-radius: 50px;
+    font-size: 1.1rem;
+    font-weight: 600;
+    cursor: pointer;
+    transition: all 0.3s ease;
+    text-transform: uppercase;
+    letter-spacing: 1px;
+}
+
+.convert-btn:hover {
+    transform: translateY(-2px);
+    box-shadow: 0 10px 20px rgba(255, 107, 107, 0.3);
+}
+
+.convert-btn:disabled {
+    opacity: 0.6;
+    cursor: not-allowed;
+    transform: none;
+}
+
+.progress-container {
+    display: none;
+    margin-top: 1rem;
+    background: rgba(255, 255, 255, 0.1);
+    border-radius: 15px;
+    padding: 1rem;
+}
+
+.progress-bar {
+    width: 100%;
+    height: 10px;
+    background: rgba(255, 255, 255, 0.2);
+    border-radius: 5px;
+    overflow: hidden;
+    margin-bottom: 0.5rem;
+}
+
+.progress-fill {
+    height: 100%;
+    background: linear-gradient(90deg, #4facfe, #00f2fe);
+    width: 0%;
+    transition: width 0.3s ease;
+}
+
+.progress-text {
+    text-align: center;
+    font-weight: 600;
+    margin-bottom: 0.5rem;
+}
+
+.progress-details {
+    text-align: center;
+    font-size: 0.9rem;
+    opacity: 0.8;
+}
+
+.result-container {
+    display: none;
+    background: rgba(255, 255, 255, 0.1);
+    backdrop-filter: blur(10px);
+    border-radius: 20px;
+    padding: 2rem;
+    margin-top: 2rem;
+    animation: fadeInUp 0.5s ease-out;
+}
+
+.result-success {
+    border: 2px solid #4CAF50;
+}
+
+.result-error {
+    border: 2px solid #f44336;
+}
+
+.download-btn {
+    display: inline-block;
+    padding: 1rem 2rem;
+    background: linear-gradient(45deg, #4CAF50, #45a049);
+    color: white;
+    text-decoration: none;
+    border-radius: 50px;
+    font-weight: 600;
+    transition: all 0.3s ease;
+    margin-top: 1rem;
+}
+
+.download-btn:hover {
+    transform: translateY(-2px);
+    box-shadow: 0 10px 20px rgba(76, 175, 80, 0.3);
+}
+
+.sky-keyboard {
+    display: grid;
+    grid-template-columns: repeat(5, 1fr);
+    gap: 10px;
+    max-width: 400px;
+    margin: 2rem auto;
+    padding: 20px;
+    background: rgba(255, 255, 255, 0.1);
+    border-radius: 20px;
+    backdrop-filter: blur(10px);
+}
+
+.sky-key {
+    aspect-ratio: 1;
+    border-radius: 50%;
+    background: rgba(255, 255, 255, 0.2);
+    border: 2px solid rgba(255, 255, 255, 0.4);
+    display: flex;
+    align-items: center;
+    justify-content: center;
+    font-weight: 600;
+    transition: all 0.2s ease;
+    cursor: pointer;
+}
+
+.sky-key:hover {
+    background: rgba(255, 255, 255, 0.3);
+    transform: scale(1.05);
+}
+
+.sky-key.diamond {
+    transform: rotate(45deg);
+}
+
+.sky-key.diamond span {
+    transform: rotate(-45deg);
+}
+
+.features-grid {
+    display: grid;
+    grid-template-columns: repeat(auto-fit, minmax(250px, 1fr));
+    gap: 1.5rem;
+    margin-top: 3rem;
+}
+
+.feature-card {
+    text-align: center;
+    padding: 1.5rem;
+    background: rgba(255, 255, 255, 0.05);
+    border-radius: 15px;
+    transition: all 0.3s ease;
+}
+
+.feature-card:hover {
+    background: rgba(255, 255, 255, 0.1);
+    transform: translateY(-3px);
+}
+
+.feature-icon {
+    font-size: 2.5rem;
+    margin-bottom: 1rem;
+}
+
+@keyframes fadeInDown {
+    from {
+        opacity: 0;
+        transform: translateY(-30px);
+    }
+    to {
+        opacity: 1;
+        transform: translateY(0);
+    }
+}
+
+@keyframes fadeInUp {
+    from {
+        opacity: 0;
+        transform: translateY(30px);
+    }
+    to {
+        opacity: 1;
+        transform: translateY(0);
+    }
+}
+
+@media (max-width: 768px) {
+    .converter-grid {
+        grid-template-columns: 1fr;
+    }
+    
+    .header h1 {
+        font-size: 2rem;
+    }
+    
+    .container {
+        padding: 15px;
+    }
+}
+'''
+
 # Modern, beautiful HTML template with Sky-inspired design
 HTML_TEMPLATE = '''
 <!DOCTYPE html>
@@ -403,347 +902,7 @@ HTML_TEMPLATE = '''
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
     <title>Sky Music Converter</title>
-    <style>
-        * {
-            margin: 0;
-            padding: 0;
-            box-sizing: border-box;
-        }
-
-        body {
-            font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, Oxygen, Ubuntu, Cantarell, sans-serif;
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            min-height: 100vh;
-            color: white;
-            overflow-x: hidden;
-        }
-
-        .container {
-            max-width: 1200px;
-            margin: 0 auto;
-            padding: 20px;
-            position: relative;
-            z-index: 2;
-        }
-
-        .header {
-            text-align: center;
-            margin-bottom: 3rem;
-            animation: fadeInDown 1s ease-out;
-        }
-
-        .header h1 {
-            font-size: 3rem;
-            font-weight: 700;
-            margin-bottom: 1rem;
-            background: linear-gradient(45deg, #fff, #f0f8ff);
-            -webkit-background-clip: text;
-            -webkit-text-fill-color: transparent;
-            background-clip: text;
-        }
-
-        .header p {
-            font-size: 1.2rem;
-            opacity: 0.9;
-            max-width: 600px;
-            margin: 0 auto;
-        }
-
-        .converter-grid {
-            display: grid;
-            grid-template-columns: repeat(auto-fit, minmax(400px, 1fr));
-            gap: 2rem;
-            margin-bottom: 3rem;
-        }
-
-        .converter-card {
-            background: rgba(255, 255, 255, 0.1);
-            backdrop-filter: blur(10px);
-            border: 1px solid rgba(255, 255, 255, 0.2);
-            border-radius: 20px;
-            padding: 2rem;
-            transition: all 0.3s ease;
-            animation: fadeInUp 1s ease-out;
-        }
-
-        .converter-card:hover {
-            transform: translateY(-5px);
-            background: rgba(255, 255, 255, 0.15);
-            box-shadow: 0 20px 40px rgba(0, 0, 0, 0.2);
-        }
-
-        .card-icon {
-            font-size: 3rem;
-            margin-bottom: 1rem;
-            text-align: center;
-        }
-
-        .card-title {
-            font-size: 1.5rem;
-            font-weight: 600;
-            margin-bottom: 1rem;
-            text-align: center;
-        }
-
-        .input-group {
-            margin-bottom: 1.5rem;
-        }
-
-        .input-group label {
-            display: block;
-            margin-bottom: 0.5rem;
-            font-weight: 500;
-        }
-
-        .input-field {
-            width: 100%;
-            padding: 1rem;
-            border: 2px solid rgba(255, 255, 255, 0.3);
-            border-radius: 10px;
-            background: rgba(255, 255, 255, 0.1);
-            color: white;
-            font-size: 1rem;
-            transition: all 0.3s ease;
-        }
-
-        .input-field::placeholder {
-            color: rgba(255, 255, 255, 0.7);
-        }
-
-        .input-field:focus {
-            outline: none;
-            border-color: rgba(255, 255, 255, 0.8);
-            background: rgba(255, 255, 255, 0.2);
-        }
-
-        .file-input-wrapper {
-            position: relative;
-            display: inline-block;
-            cursor: pointer;
-            width: 100%;
-        }
-
-        .file-input {
-            position: absolute;
-            opacity: 0;
-            width: 100%;
-            height: 100%;
-            cursor: pointer;
-        }
-
-        .file-input-display {
-            display: flex;
-            align-items: center;
-            justify-content: center;
-            min-height: 120px;
-            border: 2px dashed rgba(255, 255, 255, 0.5);
-            border-radius: 10px;
-            background: rgba(255, 255, 255, 0.05);
-            transition: all 0.3s ease;
-            text-align: center;
-        }
-
-        .file-input-wrapper:hover .file-input-display {
-            border-color: rgba(255, 255, 255, 0.8);
-            background: rgba(255, 255, 255, 0.1);
-        }
-
-        .convert-btn {
-            width: 100%;
-            padding: 1rem 2rem;
-            background: linear-gradient(45deg, #ff6b6b, #ff8e53);
-            color: white;
-            border: none;
-            border-radius: 50px;
-            font-size: 1.1rem;
-            font-weight: 600;
-            cursor: pointer;
-            transition: all 0.3s ease;
-            text-transform: uppercase;
-            letter-spacing: 1px;
-        }
-
-        .convert-btn:hover {
-            transform: translateY(-2px);
-            box-shadow: 0 10px 20px rgba(255, 107, 107, 0.3);
-        }
-
-        .convert-btn:disabled {
-            opacity: 0.6;
-            cursor: not-allowed;
-            transform: none;
-        }
-
-        .progress-container {
-            display: none;
-            margin-top: 1rem;
-            background: rgba(255, 255, 255, 0.1);
-            border-radius: 15px;
-            padding: 1rem;
-        }
-
-        .progress-bar {
-            width: 100%;
-            height: 10px;
-            background: rgba(255, 255, 255, 0.2);
-            border-radius: 5px;
-            overflow: hidden;
-            margin-bottom: 0.5rem;
-        }
-
-        .progress-fill {
-            height: 100%;
-            background: linear-gradient(90deg, #4facfe, #00f2fe);
-            width: 0%;
-            transition: width 0.3s ease;
-        }
-
-        .progress-text {
-            text-align: center;
-            font-weight: 600;
-            margin-bottom: 0.5rem;
-        }
-
-        .progress-details {
-            text-align: center;
-            font-size: 0.9rem;
-            opacity: 0.8;
-        }
-
-        .result-container {
-            display: none;
-            background: rgba(255, 255, 255, 0.1);
-            backdrop-filter: blur(10px);
-            border-radius: 20px;
-            padding: 2rem;
-            margin-top: 2rem;
-            animation: fadeInUp 0.5s ease-out;
-        }
-
-        .result-success {
-            border: 2px solid #4CAF50;
-        }
-
-        .result-error {
-            border: 2px solid #f44336;
-        }
-
-        .download-btn {
-            display: inline-block;
-            padding: 1rem 2rem;
-            background: linear-gradient(45deg, #4CAF50, #45a049);
-            color: white;
-            text-decoration: none;
-            border-radius: 50px;
-            font-weight: 600;
-            transition: all 0.3s ease;
-            margin-top: 1rem;
-        }
-
-        .download-btn:hover {
-            transform: translateY(-2px);
-            box-shadow: 0 10px 20px rgba(76, 175, 80, 0.3);
-        }
-
-        .sky-keyboard {
-            display: grid;
-            grid-template-columns: repeat(5, 1fr);
-            gap: 10px;
-            max-width: 400px;
-            margin: 2rem auto;
-            padding: 20px;
-            background: rgba(255, 255, 255, 0.1);
-            border-radius: 20px;
-            backdrop-filter: blur(10px);
-        }
-
-        .sky-key {
-            aspect-ratio: 1;
-            border-radius: 50%;
-            background: rgba(255, 255, 255, 0.2);
-            border: 2px solid rgba(255, 255, 255, 0.4);
-            display: flex;
-            align-items: center;
-            justify-content: center;
-            font-weight: 600;
-            transition: all 0.2s ease;
-            cursor: pointer;
-        }
-
-        .sky-key:hover {
-            background: rgba(255, 255, 255, 0.3);
-            transform: scale(1.05);
-        }
-
-        .sky-key.diamond {
-            transform: rotate(45deg);
-        }
-
-        .sky-key.diamond span {
-            transform: rotate(-45deg);
-        }
-
-        .features-grid {
-            display: grid;
-            grid-template-columns: repeat(auto-fit, minmax(250px, 1fr));
-            gap: 1.5rem;
-            margin-top: 3rem;
-        }
-
-        .feature-card {
-            text-align: center;
-            padding: 1.5rem;
-            background: rgba(255, 255, 255, 0.05);
-            border-radius: 15px;
-            transition: all 0.3s ease;
-        }
-
-        .feature-card:hover {
-            background: rgba(255, 255, 255, 0.1);
-            transform: translateY(-3px);
-        }
-
-        .feature-icon {
-            font-size: 2.5rem;
-            margin-bottom: 1rem;
-        }
-
-        @keyframes fadeInDown {
-            from {
-                opacity: 0;
-                transform: translateY(-30px);
-            }
-            to {
-                opacity: 1;
-                transform: translateY(0);
-            }
-        }
-
-        @keyframes fadeInUp {
-            from {
-                opacity: 0;
-                transform: translateY(30px);
-            }
-            to {
-                opacity: 1;
-                transform: translateY(0);
-            }
-        }
-
-        @media (max-width: 768px) {
-            .converter-grid {
-                grid-template-columns: 1fr;
-            }
-            
-            .header h1 {
-                font-size: 2rem;
-            }
-            
-            .container {
-                padding: 15px;
-            }
-        }
-    </style>
+    <link rel="stylesheet" href="/static/app.css">
 </head>
 <body>
     <div class="container">
@@ -832,6 +991,13 @@ HTML_TEMPLATE = '''
                                 </div>
                             </div>
                         </div>
+                        <template id="file-selected-template">
+                            <div>
+                                <div style="font-size: 2rem; margin-bottom: 10px;">🎵</div>
+                                <div><strong class="file-name"></strong></div>
+                                <div class="file-size" style="font-size: 0.9rem; opacity: 0.7; margin-top: 5px;"></div>
+                            </div>
+                        </template>
                     </div>
                 </div>
                 
@@ -889,46 +1055,73 @@ HTML_TEMPLATE = '''
     </div>
 
     <script>
-        let progressIntervals = {};
+        let progressStreams = {};
+        let scheduledWrites = {};
+        let fileDisplayNodes = null;
+        let conversionControllers = {};
+
+        function newJobId(prefix) {
+            // crypto.randomUUID only exists in secure contexts (https/localhost); when the page is
+            // opened over plain http on a LAN address, build the same v4 UUID from getRandomValues
+            if (window.crypto && crypto.randomUUID) {
+                return `${prefix}_${crypto.randomUUID()}`;
+            }
+            const bytes = crypto.getRandomValues(new Uint8Array(16));
+            bytes[6] = (bytes[6] & 0x0f) | 0x40;
+            bytes[8] = (bytes[8] & 0x3f) | 0x80;
+            const hex = Array.from(bytes, b => b.toString(16).padStart(2, '0')).join('');
+            return `${prefix}_${hex.slice(0, 8)}-${hex.slice(8, 12)}-${hex.slice(12, 16)}-${hex.slice(16, 20)}-${hex.slice(20)}`;
+        }
+
+        function schedule(key, write) {
+            // Coalesce DOM writes: only the latest write per key runs, once, in the next frame
+            const queued = key in scheduledWrites;
+            scheduledWrites[key] = write;
+            if (queued) return;
+            
+            requestAnimationFrame(() => {
+                const latest = scheduledWrites[key];
+                delete scheduledWrites[key];
+                latest();
+            });
+        }
 
         function handleFileSelect(event) {
             const file = event.target.files[0];
-            const display = document.getElementById('file-display');
-            const btn = document.getElementById('file-btn');
+            document.getElementById('file-btn').disabled = !file;
             
-            if (file) {
-                display.innerHTML = `
-                    <div>
-                        <div style="font-size: 2rem; margin-bottom: 10px;">🎵</div>
-                        <div><strong>${file.name}</strong></div>
-                        <div style="font-size: 0.9rem; opacity: 0.7; margin-top: 5px;">
-                            ${(file.size / 1024 / 1024).toFixed(2)} MB
-                        </div>
-                    </div>
-                `;
-                btn.disabled = false;
-            } else {
-                display.innerHTML = `
-                    <div>
-                        <div style="font-size: 2rem; margin-bottom: 10px;">📁</div>
-                        <div>Drop audio file here or click to browse</div>
-                        <div style="font-size: 0.9rem; opacity: 0.7; margin-top: 5px;">
-                            Supports: MP3, WAV, M4A, FLAC, OGG
-                        </div>
-                    </div>
-                `;
-                btn.disabled = true;
-            }
+            schedule('file-display', () => {
+                const display = document.getElementById('file-display');
+                
+                // Both states are built once and swapped in, so picking a file parses no HTML
+                if (!fileDisplayNodes) {
+                    fileDisplayNodes = {
+                        empty: display.firstElementChild,
+                        selected: document.getElementById('file-selected-template').content.firstElementChild.cloneNode(true)
+                    };
+                }
+                
+                if (file) {
+                    fileDisplayNodes.selected.querySelector('.file-name').textContent = file.name;
+                    fileDisplayNodes.selected.querySelector('.file-size').textContent = `${(file.size / 1024 / 1024).toFixed(2)} MB`;
+                    display.replaceChildren(fileDisplayNodes.selected);
+                } else {
+                    display.replaceChildren(fileDisplayNodes.empty);
+                }
+            });
         }
 
         function updateProgress(type, percent, text, details) {
-            const fill = document.getElementById(`${type}-progress-fill`);
-            const textEl = document.getElementById(`${type}-progress-text`);
-            const detailsEl = document.getElementById(`${type}-progress-details`);
-            
-            fill.style.width = percent + '%';
-            textEl.textContent = text;
-            detailsEl.textContent = details || '';
+            // All three writes land in one frame; only the latest state per type is applied
+            schedule(`progress-${type}`, () => {
+                const fill = document.getElementById(`${type}-progress-fill`);
+                const textEl = document.getElementById(`${type}-progress-text`);
+                const detailsEl = document.getElementById(`${type}-progress-details`);
+                
+                fill.style.width = percent + '%';
+                textEl.textContent = text;
+                detailsEl.textContent = details || '';
+            });
         }
 
         function showProgress(type) {
@@ -939,30 +1132,66 @@ HTML_TEMPLATE = '''
         function hideProgress(type) {
             document.getElementById(`${type}-progress`).style.display = 'none';
             document.getElementById(`${type}-btn`).disabled = false;
-            if (progressIntervals[type]) {
-                clearInterval(progressIntervals[type]);
-                delete progressIntervals[type];
+            stopProgressPolling(type);
+            abortConversion(type);
+        }
+
+        function beginConversion(type) {
+            // A new conversion supersedes one still in flight for the same type
+            abortConversion(type);
+            const controller = new AbortController();
+            conversionControllers[type] = controller;
+            return controller.signal;
+        }
+
+        function abortConversion(type) {
+            if (conversionControllers[type]) {
+                conversionControllers[type].abort();
+                delete conversionControllers[type];
             }
         }
 
-        function startProgressPolling(type, jobId) {
-            progressIntervals[type] = setInterval(async () => {
-                try {
-                    const response = await fetch(`/progress/${jobId}`);
-                    const data = await response.json();
-                    
-                    if (data.percent !== undefined) {
-                        updateProgress(type, data.percent, data.message, data.details);
-                        
-                        if (data.percent >= 100) {
-                            clearInterval(progressIntervals[type]);
-                            delete progressIntervals[type];
-                        }
+        window.addEventListener('beforeunload', () => {
+            Object.keys(conversionControllers).forEach(abortConversion);
+        });
+
+        function startProgressPolling(type, jobId, signal) {
+            // The server pushes each progress change over one Server-Sent Events stream and
+            // finishes with a 'result' event; the returned promise resolves with that result
+            stopProgressPolling(type);
+            const source = new EventSource(`/progress/${jobId}`);
+            progressStreams[type] = source;
+            
+            source.onmessage = (event) => {
+                const data = JSON.parse(event.data);
+                updateProgress(type, data.percent, data.message, data.details);
+            };
+            
+            return new Promise((resolve, reject) => {
+                signal.addEventListener('abort', () => {
+                    stopProgressPolling(type);
+                    reject(new DOMException('Conversion aborted', 'AbortError'));
+                });
+                source.addEventListener('result', (event) => {
+                    stopProgressPolling(type);
+                    resolve(JSON.parse(event.data));
+                });
+                source.onerror = () => {
+                    console.error('Progress stream error for job', jobId);
+                    // CLOSED means the browser gave up reconnecting
+                    if (source.readyState === EventSource.CLOSED) {
+                        stopProgressPolling(type);
+                        reject(new Error('Lost connection to the progress stream'));
                     }
-                } catch (error) {
-                    console.error('Progress polling error:', error);
-                }
-            }, 500); // Poll every 500ms
+                };
+            });
+        }
+
+        function stopProgressPolling(type) {
+            if (progressStreams[type]) {
+                progressStreams[type].close();
+                delete progressStreams[type];
+            }
         }
 
         function showResult(success, message, downloadUrl = null) {
@@ -989,48 +1218,55 @@ HTML_TEMPLATE = '''
             content.innerHTML = html;
         }
 
-        async function convertYoutube() {
-            const url = document.getElementById('youtube-url').value.trim();
-            const title = document.getElementById('youtube-title').value.trim() || 'YouTube Song';
-            
-            if (!url) {
-                alert('Please enter a YouTube URL');
-                return;
-            }
-            
-            const jobId = 'yt_' + Date.now();
-            showProgress('youtube');
-            startProgressPolling('youtube', jobId);
-            updateProgress('youtube', 1, 'Starting conversion...', 'Initializing YouTube converter');
+        async function runConversion(type, jobPrefix, endpoint, buildInit, startDetails) {
+            // Shared flow for both converters: submit, follow the job's progress stream until
+            // its outcome arrives and show it. buildInit(jobId) returns the fetch options for the submit.
+            const jobId = newJobId(jobPrefix);
+            showProgress(type);
+            const signal = beginConversion(type);
+            updateProgress(type, 1, 'Starting conversion...', startDetails);
             
             try {
-                const response = await fetch('/convert/youtube', {
-                    method: 'POST',
-                    headers: {
-                        'Content-Type': 'application/json',
-                    },
-                    body: JSON.stringify({ url, title, job_id: jobId })
-                });
+                const response = await fetch(endpoint, { method: 'POST', signal, ...buildInit(jobId) });
                 
-                const result = await response.json();
+                let result = await response.json();
+                if (result.queued) {
+                    // Accepted and running in the background, so the server knows the job now
+                    // (a stream for an unknown job is closed); the stream replays its current state
+                    result = await startProgressPolling(type, jobId, signal);
+                }
                 
                 if (result.success) {
-                    updateProgress('youtube', 100, 'Conversion complete!', `Successfully generated ${result.notes_count} notes`);
-                    setTimeout(() => {
-                        showResult(true, `Successfully converted "${result.title}" to Sky Music format! Generated ${result.notes_count} notes.`, result.download_url);
-                        hideProgress('youtube');
-                    }, 1000);
+                    updateProgress(type, 100, 'Conversion complete!', `Successfully generated ${result.notes_count} notes`);
+                    showResult(true, `Successfully converted "${result.title}" to Sky Music format! Generated ${result.notes_count} notes.`, result.download_url);
                 } else {
                     showResult(false, result.error || 'An error occurred during conversion');
-                    hideProgress('youtube');
                 }
+                hideProgress(type);
             } catch (error) {
+                // Superseded by a newer conversion or the page is closing: leave the UI alone
+                if (error.name === 'AbortError') return;
                 showResult(false, 'Network error: ' + error.message);
-                hideProgress('youtube');
+                hideProgress(type);
+            }
+        }
+
+        function convertYoutube() {
+            const url = document.getElementById('youtube-url').value.trim();
+            const title = document.getElementById('youtube-title').value.trim() || 'YouTube Song';
+            
+            if (!url) {
+                alert('Please enter a YouTube URL');
+                return;
             }
+            
+            return runConversion('youtube', 'yt', '/convert/youtube', (jobId) => ({
+                headers: { 'Content-Type': 'application/json' },
+                body: JSON.stringify({ url, title, job_id: jobId })
+            }), 'Initializing YouTube converter');
         }
 
-        async function convertFile() {
+        function convertFile() {
             const fileInput = document.getElementById('audio-file');
             const title = document.getElementById('file-title').value.trim() || 'Audio File';
             
@@ -1039,38 +1275,13 @@ HTML_TEMPLATE = '''
                 return;
             }
             
-            const jobId = 'file_' + Date.now();
-            showProgress('file');
-            startProgressPolling('file', jobId);
-            updateProgress('file', 1, 'Starting conversion...', 'Preparing to upload file');
-            
-            const formData = new FormData();
-            formData.append('audio', fileInput.files[0]);
-            formData.append('title', title);
-            formData.append('job_id', jobId);
-            
-            try {
-                const response = await fetch('/convert/file', {
-                    method: 'POST',
-                    body: formData
-                });
-                
-                const result = await response.json();
-                
-                if (result.success) {
-                    updateProgress('file', 100, 'Conversion complete!', `Successfully generated ${result.notes_count} notes`);
-                    setTimeout(() => {
-                        showResult(true, `Successfully converted "${result.title}" to Sky Music format! Generated ${result.notes_count} notes.`, result.download_url);
-                        hideProgress('file');
-                    }, 1000);
-                } else {
-                    showResult(false, result.error || 'An error occurred during conversion');
-                    hideProgress('file');
-                }
-            } catch (error) {
-                showResult(false, 'Network error: ' + error.message);
-                hideProgress('file');
-            }
+            return runConversion('file', 'file', '/convert/file', (jobId) => {
+                const formData = new FormData();
+                formData.append('audio', fileInput.files[0]);
+                formData.append('title', title);
+                formData.append('job_id', jobId);
+                return { body: formData };
+            }, 'Preparing to upload file');
         }
 
         // Add keyboard interactions for Sky keyboard
@@ -1089,29 +1300,108 @@ HTML_TEMPLATE = '''
 </html>
 '''
 
+def build_static_asset(text: str) -> Dict[str, Tuple[bytes, str]]:
+    """Pre-encode a constant page asset once: encoding -> (body, etag)"""
+    raw = text.encode('utf-8')
+    bodies = {'identity': raw, 'gzip': gzip.compress(raw, 9)}
+    if brotli is not None:
+        bodies['br'] = brotli.compress(raw, quality=11)
+    digest = hashlib.sha256(raw).hexdigest()[:16]
+    return {encoding: (body, f"{digest}-{encoding}") for encoding, body in bodies.items()}
+
+def serve_static_asset(asset: Dict[str, Tuple[bytes, str]], mimetype: str) -> Response:
+    """Serve a pre-encoded asset in the best encoding the client accepts, honouring If-None-Match"""
+    encoding = next((name for name in ('br', 'gzip') if name in asset and name in request.accept_encodings), 'identity')
+    body, etag = asset[encoding]
+    headers = {'Cache-Control': 'public, max-age=3600', 'Vary': 'Accept-Encoding'}
+    
+    if request.if_none_match.contains(etag):
+        response = Response(status=304, headers=headers)
+    else:
+        if encoding != 'identity':
+            headers['Content-Encoding'] = encoding
+        response = Response(body, mimetype=mimetype, headers=headers)
+    response.set_etag(etag)
+    return response
+
+# The page has no template placeholders, so it is encoded and compressed once at import
+INDEX_ASSET = build_static_asset(HTML_TEMPLATE)
+CSS_ASSET = build_static_asset(APP_CSS)
+
 @app.route('/')
 def index():
-    return render_template_string(HTML_TEMPLATE)
+    return serve_static_asset(INDEX_ASSET, 'text/html')
+
+@app.route('/static/app.css')
+def app_css():
+    return serve_static_asset(CSS_ASSET, 'text/css')
 
 @app.route('/progress/<job_id>')
 def get_progress(job_id):
-    """Get progress for a specific job"""
-    if job_id in progress_data:
-        return jsonify(progress_data[job_id])
-    else:
-        return jsonify({'percent': 0, 'message': 'Job not found', 'details': ''})
+    """Stream progress for a specific job as Server-Sent Events"""
+    if not JOB_ID_RE.match(job_id):
+        return jsonify({'success': False, 'error': 'Invalid job id'}), 400
+    
+    # Events carry the record version as their id; a reconnecting browser sends it back as
+    # Last-Event-ID, so state it has already seen is not sent again
+    try:
+        start_version = int(request.headers.get('Last-Event-ID', 0))
+    except ValueError:
+        start_version = 0
+    
+    def current_version() -> int:
+        record = progress_data.get(job_id)
+        return record['version'] if record else 0
+    
+    def generate():
+        last_version = start_version
+        while True:
+            # Wait for this job's state to change or its result to arrive
+            with progress_condition:
+                progress_condition.wait_for(
+                    lambda: current_version() != last_version or job_id in job_results,
+                    timeout=PROGRESS_KEEPALIVE
+                )
+                record = progress_data.get(job_id)
+                result = job_results.get(job_id)
+            
+            # Never started, or finished and already forgotten (e.g. an EventSource
+            # reconnecting after FINISHED_JOB_TTL): don't pin a server thread on it
+            if record is None and result is None:
+                yield f"event: result\ndata: {json.dumps(UNKNOWN_JOB_RESULT)}\n\n"
+                return
+            
+            if record and record['version'] != last_version:
+                last_version = record['version']
+                yield f"id: {last_version}\ndata: {record['json']}\n\n"
+            elif result is None:
+                yield ": keep-alive\n\n"
+            
+            # The job is finished: deliver its outcome and close the stream
+            if result is not None:
+                yield f"event: result\ndata: {json.dumps(result)}\n\n"
+                return
+    
+    return Response(generate(), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+def publish_result(job_id: str, result: Dict):
+    """Store a job's final outcome and wake its progress streams"""
+    with progress_condition:
+        job_results[job_id] = result
+        job_results.move_to_end(job_id)
+        while len(job_results) > MAX_TRACKED_JOBS:
+            job_results.popitem(last=False)
+        progress_condition.notify_all()
+    
+    # Give clients time to read the outcome, then free the job's entries
+    timer = threading.Timer(FINISHED_JOB_TTL, forget_job, args=(job_id,))
+    timer.daemon = True
+    timer.start()
 
-@app.route('/convert/youtube', methods=['POST'])
-def convert_youtube():
+def run_youtube_job(url: str, title: str, job_id: str):
+    """Download, analyze, convert and save a YouTube video (runs on job_executor)"""
     try:
-        data = request.get_json()
-        url = data.get('url')
-        title = data.get('title', 'YouTube Song')
-        job_id = data.get('job_id', str(uuid.uuid4()))
-        
-        logger.info(f"Converting YouTube URL: {url}")
-        converter.update_progress(job_id, 1, "Starting YouTube conversion", "Initializing converter")
-        
         # Download audio
         audio_path = converter.download_youtube_audio(url, job_id)
         
@@ -1122,13 +1412,11 @@ def convert_youtube():
         sheet_data = converter.convert_to_sky_sheet(pitches, times, tempo, title, job_id)
         
         # Save sheet
-        safe_filename = "".join(c for c in title if c.isalnum() or c in (' ', '-', '_')).strip()
-        output_path = converter.save_sheet(sheet_data, safe_filename)
+        output_path = converter.save_sheet(sheet_data, safe_filename(title))
         
-        # Cleanup
-        converter.cleanup_temp_files()
+        forget_sheet(output_path)
         
-        return jsonify({
+        publish_result(job_id, {
             'success': True,
             'title': title,
             'download_url': f'/download/{Path(output_path).name}',
@@ -1137,7 +1425,67 @@ def convert_youtube():
         
     except Exception as e:
         logger.error(f"YouTube conversion failed: {e}")
-        converter.cleanup_temp_files()
+        publish_result(job_id, {'success': False, 'error': str(e)})
+    finally:
+        # Cleanup (only this job's files; other jobs may still be running)
+        converter.cleanup_job_files(job_id)
+
+def run_file_job(source: Union[Path, BinaryIO], file_id: str, title: str, job_id: str):
+    """Analyze, convert and save an uploaded file (runs on job_executor)"""
+    try:
+        converter.update_progress(job_id, 10, "File uploaded", "Preparing audio for analysis")
+        
+        # Analyze audio
+        pitches, times, tempo = converter.analyze_audio(source if hasattr(source, 'read') else str(source), job_id)
+        
+        # Convert to Sky Music
+        sheet_data = converter.convert_to_sky_sheet(pitches, times, tempo, title, job_id)
+        
+        # Save sheet
+        output_path = converter.save_sheet(sheet_data, safe_filename(title))
+        
+        remember_upload(file_id, title, output_path, len(sheet_data['songNotes']))
+        
+        publish_result(job_id, {
+            'success': True,
+            'title': title,
+            'download_url': f'/download/{Path(output_path).name}',
+            'notes_count': len(sheet_data['songNotes'])
+        })
+        
+    except Exception as e:
+        logger.error(f"File conversion failed: {e}")
+        publish_result(job_id, {'success': False, 'error': str(e)})
+    finally:
+        if hasattr(source, 'close'):
+            source.close()
+        # Cleanup (only this job's files; other jobs may still be running)
+        converter.cleanup_job_files(job_id)
+
+@app.route('/convert/youtube', methods=['POST'])
+def convert_youtube():
+    try:
+        data = request.get_json(silent=True) or {}
+        url = (data.get('url') or '').strip()
+        title = data.get('title', 'YouTube Song')
+        job_id = data.get('job_id') or f"yt_{uuid.uuid4()}"
+        
+        if not JOB_ID_RE.match(job_id):
+            return jsonify({'success': False, 'error': 'Invalid job id'}), 400
+        
+        # Reject bad links before any yt-dlp work or progress tracking starts
+        if not YT_RE.match(url):
+            return jsonify({'success': False, 'error': 'Please enter a valid YouTube video URL'}), 400
+        
+        logger.info(f"Converting YouTube URL: {url}")
+        converter.update_progress(job_id, 1, "Starting YouTube conversion", "Initializing converter")
+        
+        # The conversion runs in the background; the outcome arrives on the progress stream
+        job_executor.submit(run_youtube_job, url, title, job_id)
+        return jsonify({'success': True, 'queued': True, 'job_id': job_id}), 202
+        
+    except Exception as e:
+        logger.error(f"YouTube conversion failed: {e}")
         return jsonify({
             'success': False,
             'error': str(e)
@@ -1145,10 +1493,18 @@ def convert_youtube():
 
 @app.route('/convert/file', methods=['POST'])
 def convert_file():
+    job_id = None
     try:
+        # Refuse oversized uploads from the declared length, before the body is read
+        if request.content_length is not None and request.content_length > MAX_UPLOAD_SIZE:
+            return jsonify({'success': False, 'error': f'File too large (limit {MAX_UPLOAD_SIZE // (1024 * 1024)} MB)'}), 413
+        
         audio_file = request.files.get('audio')
         title = request.form.get('title', 'Audio File')
-        job_id = request.form.get('job_id', str(uuid.uuid4()))
+        job_id = request.form.get('job_id') or f"file_{uuid.uuid4()}"
+        
+        if not JOB_ID_RE.match(job_id):
+            return jsonify({'success': False, 'error': 'Invalid job id'}), 400
         
         if not audio_file:
             return jsonify({'success': False, 'error': 'No audio file provided'}), 400
@@ -1156,56 +1512,62 @@ def convert_file():
         logger.info(f"Converting uploaded file: {audio_file.filename}")
         converter.update_progress(job_id, 1, "Starting file conversion", f"Processing {audio_file.filename}")
         
-        # Save uploaded file temporarily
-        temp_path = converter.temp_dir / f"upload_{int(time.time())}.{audio_file.filename.split('.')[-1]}"
-        audio_file.save(str(temp_path))
-        
-        converter.update_progress(job_id, 10, "File uploaded", "Converting to WAV format if needed")
-        
-        # Convert to WAV if needed
-        if temp_path.suffix.lower() != '.wav':
-            wav_path = temp_path.with_suffix('.wav')
-            audio = AudioSegment.from_file(str(temp_path))
-            audio.export(str(wav_path), format="wav")
-            temp_path.unlink()
-            temp_path = wav_path
-        
-        # Analyze audio
-        pitches, times, tempo = converter.analyze_audio(str(temp_path), job_id)
+        # Take the upload in (it has to be read on the request thread)
+        source, file_id = receive_upload(audio_file, converter.job_temp_dir(job_id))
         
-        # Convert to Sky Music
-        sheet_data = converter.convert_to_sky_sheet(pitches, times, tempo, title, job_id)
-        
-        # Save sheet
-        safe_filename = "".join(c for c in title if c.isalnum() or c in (' ', '-', '_')).strip()
-        output_path = converter.save_sheet(sheet_data, safe_filename)
+        # Same audio converted before under this title: hand back the existing sheet
+        cached = lookup_upload(file_id, title)
+        if cached:
+            output_path, notes_count = cached
+            if hasattr(source, 'close'):
+                source.close()
+            converter.cleanup_job_files(job_id)
+            result = {
+                'success': True,
+                'title': title,
+                'download_url': f'/download/{Path(output_path).name}',
+                'notes_count': notes_count
+            }
+            converter.update_progress(job_id, 100, "Conversion complete!", "Reused the sheet from an identical earlier upload")
+            publish_result(job_id, result)
+            return jsonify(result)
         
-        # Cleanup
-        converter.cleanup_temp_files()
-        
-        return jsonify({
-            'success': True,
-            'title': title,
-            'download_url': f'/download/{Path(output_path).name}',
-            'notes_count': len(sheet_data['songNotes'])
-        })
+        # The conversion runs in the background; the outcome arrives on the progress stream
+        job_executor.submit(run_file_job, source, file_id, title, job_id)
+        return jsonify({'success': True, 'queued': True, 'job_id': job_id}), 202
         
     except Exception as e:
         logger.error(f"File conversion failed: {e}")
-        converter.cleanup_temp_files()
+        if job_id and JOB_ID_RE.match(job_id):
+            converter.cleanup_job_files(job_id)
         return jsonify({
             'success': False,
             'error': str(e)
         }), 500
 
+@app.route('/result/<job_id>')
+def get_result(job_id):
+    """Final outcome of a conversion job; 202 while it is still running"""
+    if not JOB_ID_RE.match(job_id):
+        return jsonify({'success': False, 'error': 'Invalid job id'}), 400
+    
+    result = job_results.get(job_id)
+    if result is None:
+        return jsonify({'pending': True}), 202
+    return jsonify(result)
+
 @app.route('/download/<filename>')
 def download_file(filename):
     try:
-        file_path = converter.output_dir / filename
-        if file_path.exists():
-            return send_file(str(file_path), as_attachment=True)
-        else:
-            return "File not found", 404
+        # Streamed from disk with ETag/Last-Modified and Range support; the path is
+        # joined safely, so names like '../x' can't escape the output folder
+        return send_from_directory(
+            converter.output_dir.resolve(), filename,
+            as_attachment=True, mimetype='application/json',
+            conditional=True, etag=True, max_age=3600
+        )
+    except NotFound:
+        return "File not found", 404
     except Exception as e:
         logger.error(f"Download failed: {e}")
         return "Download failed", 500
@@ -1234,9 +1596,11 @@ def main():
     print("="*60)
     
     try:
-        app.run(host='0.0.0.0', port=5000, debug=False)
+        serve(app, host='0.0.0.0', port=5000, threads=SERVER_THREADS,
+              connection_limit=200, channel_timeout=120)
     except KeyboardInterrupt:
         print("\n🛑 Server stopped by user")
+        job_executor.shutdown(wait=False, cancel_futures=True)
         converter.cleanup_temp_files()
 
 if __name__ == '__main__':
@@ -0,0 +1,66 @@
+"""Pitch tracking at ANALYSIS_SR in sky_music_converter_final.py against the 22.05 kHz framing"""
+
+import builtins
+import importlib
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+librosa = pytest.importorskip("librosa")
+
+REPO_DIR = Path(__file__).resolve().parents[1]
+
+
+@pytest.fixture(scope="module")
+def final(tmp_path_factory):
+    """Import the converter module without its interactive FFmpeg prompt, from a scratch cwd"""
+    patch = pytest.MonkeyPatch()
+    patch.setattr(builtins, "input", lambda *args: "y")
+    patch.syspath_prepend(str(REPO_DIR))
+    patch.chdir(tmp_path_factory.mktemp("run"))
+    try:
+        module = importlib.import_module("sky_music_converter_final")
+    except SystemExit:
+        patch.undo()
+        pytest.skip("converter dependencies are not installed")
+    yield module
+    patch.undo()
+    sys.modules.pop("sky_music_converter_final", None)
+
+
+def harmonic_tone(freq, sr, seconds):
+    """A tone with a few decaying harmonics, closer to a real instrument than a sine"""
+    t = np.arange(int(seconds * sr)) / sr
+    return sum(amp * np.sin(2 * np.pi * k * freq * t) for k, amp in [(1, 0.5), (2, 0.3), (3, 0.2)])
+
+
+def test_every_key_maps_back_to_itself(final):
+    converter = final.converter
+    for name, freq in zip(converter._NOTE_NAMES, converter._NOTE_FREQS):
+        y = harmonic_tone(freq, final.ANALYSIS_SR, 1.0).astype(np.float32)
+        f0, voiced = converter.track_pitch(y, final.ANALYSIS_SR)
+        pitch = np.median(f0[voiced])
+        mapped = converter._NOTE_NAMES[np.argmin(np.abs(np.log2(pitch) - converter._LOG_NOTE_FREQS))]
+        assert mapped == name, (name, pitch)
+
+
+def test_melody_tracks_as_well_as_22050(final):
+    rng = np.random.default_rng(1)
+    melody = rng.choice(final.converter._NOTE_FREQS.astype(np.float64), size=40)
+    note_seconds = 0.4
+
+    def cents_errors(sr, frame_length, hop_length):
+        y = np.concatenate([harmonic_tone(freq, sr, note_seconds) for freq in melody]).astype(np.float32)
+        f0 = librosa.yin(y, fmin=final.FMIN_HZ, fmax=final.FMAX_HZ, sr=sr,
+                         frame_length=frame_length, hop_length=hop_length)
+        times = librosa.frames_to_time(np.arange(len(f0)), sr=sr, hop_length=hop_length)
+        expected = melody[np.minimum((times / note_seconds).astype(int), len(melody) - 1)]
+        return np.abs(1200 * np.log2(f0 / expected))
+
+    errors = cents_errors(final.ANALYSIS_SR, final.FRAME_LENGTH, final.HOP_LENGTH)
+    reference = cents_errors(22050, 2048, 512)
+    # Gross (octave/fifth) errors and in-tune frames, including the note transitions
+    assert np.mean(errors > 600) <= np.mean(reference > 600)
+    assert np.mean(errors < 50) >= np.mean(reference < 50)
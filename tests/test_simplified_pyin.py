@@ -0,0 +1,80 @@
+"""Streamed, segmented pYIN in sky_music_converter_simplified.py against one serial pyin call"""
+
+import builtins
+import importlib
+import os
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+librosa = pytest.importorskip("librosa")
+sf = pytest.importorskip("soundfile")
+
+REPO_DIR = Path(__file__).resolve().parents[1]
+
+
+@pytest.fixture(scope="module")
+def simplified(tmp_path_factory):
+    """Import the converter module without its interactive FFmpeg prompt, from a scratch cwd"""
+    patch = pytest.MonkeyPatch()
+    patch.setattr(builtins, "input", lambda *args: "")
+    patch.syspath_prepend(str(REPO_DIR))
+    patch.chdir(tmp_path_factory.mktemp("run"))
+    try:
+        module = importlib.import_module("sky_music_converter_simplified")
+    except SystemExit:
+        patch.undo()
+        pytest.skip("converter dependencies are not installed")
+    yield module
+    patch.undo()
+    sys.modules.pop("sky_music_converter_simplified", None)
+
+
+def test_streamed_pyin_matches_serial_pyin(simplified, tmp_path, monkeypatch):
+    # Short segments and several workers, so a 12 s clip crosses many seams
+    monkeypatch.setattr(simplified, "PYIN_SEGMENT_FRAMES", 64)
+    monkeypatch.setattr(os, "cpu_count", lambda: 4)
+
+    sr = 22050
+    rng = np.random.default_rng(0)
+    notes = []
+    for freq in rng.choice([262.0, 330.0, 392.0, 523.0, 659.0, 784.0], size=24):
+        t = np.arange(sr // 2) / sr
+        # Every few notes is a rest, so voicing changes inside and across segments
+        notes.append(np.zeros_like(t) if rng.random() < 0.25 else 0.4 * np.sin(2 * np.pi * freq * t))
+    y = np.concatenate(notes) + 0.01 * rng.standard_normal(len(notes) * (sr // 2))
+
+    path = tmp_path / "clip.wav"
+    sf.write(path, y, sr)
+    y, _ = sf.read(path, dtype="float32")
+
+    blocks = librosa.stream(
+        str(path),
+        block_length=simplified.STREAM_BLOCK_FRAMES,
+        frame_length=simplified.FRAME_LENGTH,
+        hop_length=simplified.HOP_LENGTH,
+        mono=True,
+    )
+    f0, voiced_probs = simplified.converter.track_pitch_pyin(blocks, sr, simplified.FMIN_HZ, simplified.FMAX_HZ)
+
+    ref_f0, _, ref_probs = librosa.pyin(
+        y,
+        fmin=simplified.FMIN_HZ,
+        fmax=simplified.FMAX_HZ,
+        sr=sr,
+        frame_length=simplified.FRAME_LENGTH,
+        hop_length=simplified.HOP_LENGTH,
+        resolution=0.1,
+    )
+
+    assert f0.shape == ref_f0.shape
+    # Per-frame probabilities see the same audio, so they match exactly
+    np.testing.assert_allclose(voiced_probs, ref_probs, atol=1e-6)
+
+    # Decoding may only differ right at a seam
+    voiced, ref_voiced = ~np.isnan(f0), ~np.isnan(ref_f0)
+    assert np.mean(voiced == ref_voiced) >= 0.99
+    both = voiced & ref_voiced
+    assert np.mean(np.isclose(f0[both], ref_f0[both], rtol=1e-3)) >= 0.99